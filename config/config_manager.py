@@ -1,4 +1,5 @@
 import json
+import os
 
 
 class ConfigurationManager:
@@ -48,3 +49,13 @@ class ConfigurationManager:
         if key in self.config_data:
             del self.config_data[key]
             self.save_config()
+
+    def get_state_dir(self):
+        """Returns the directory for sync state kept next to the config file.
+
+        The directory is created on first use.
+        """
+        config_dir = os.path.dirname(os.path.abspath(self.config_file))
+        state_dir = os.path.join(config_dir, ".syncary")
+        os.makedirs(state_dir, exist_ok=True)
+        return state_dir
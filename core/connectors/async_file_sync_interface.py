@@ -0,0 +1,144 @@
+import abc
+import asyncio
+import os
+
+
+class AsyncFileSyncInterface(abc.ABC):
+    """Asyncio counterpart of FileSyncInterface.
+
+    Every operation is a coroutine, so a sync task can keep many listings and
+    transfers in flight on one event loop instead of dedicating a thread to
+    each. The methods, arguments, return values and the
+    FileSynchronizationError contract are the same as in FileSyncInterface;
+    see there for details. Existing blocking connectors are used through
+    BlockingConnectorAdapter.
+
+    Attributes:
+        max_concurrency: The number of operations that may safely be in
+            flight at the same time.
+        batch_size: The number of operations a sync task hands to one call
+            of the batch methods.
+        content_hash_algorithm: The core.hashing algorithm matching the "hash"
+            reported in listing entries, or None.
+        supports_move: True if move_file and copy_file are implemented.
+    """
+
+    max_concurrency = 64
+    batch_size = 1
+    content_hash_algorithm = None
+    supports_move = False
+
+    @classmethod
+    def create_account(cls, config_manager):
+        """Creates the state shared by every connector of one account."""
+        return None
+
+    @classmethod
+    def from_config(cls, config_manager, account=None):
+        """Creates a connector for a task."""
+        return cls()
+
+    def configure(self, options):
+        """Applies per-task tuning options to the connector."""
+        pass
+
+    @abc.abstractmethod
+    async def get_file_list(self, path):
+        """Returns a list of files and folders at the given path."""
+        pass
+
+    async def get_file_entries(self, path):
+        """Returns the entries at the given path together with their metadata."""
+        return await self.get_file_list(path)
+
+    async def list_tree(self, path):
+        """Returns every file and folder below the given path.
+
+        Unlike FileSyncInterface.list_tree this returns a list. The default
+        implementation lists each level of the tree with concurrent
+        get_file_entries calls.
+        """
+        entries = []
+        level = [""]
+        while level:
+            listings = await asyncio.gather(
+                *(
+                    self.get_file_entries(
+                        os.path.join(path, relative_path) if relative_path else path
+                    )
+                    for relative_path in level
+                )
+            )
+            next_level = []
+            for relative_path, listing in zip(level, listings):
+                prefix = f"{relative_path}/" if relative_path else ""
+                for entry in listing:
+                    entry = dict(entry, path=prefix + entry["name"])
+                    entries.append(entry)
+                    if entry["type"] == "folder":
+                        next_level.append(entry["path"])
+            level = next_level
+        return entries
+
+    @abc.abstractmethod
+    async def download_file(self, remote_path, local_path):
+        """Downloads a file from the remote path to the local path."""
+        pass
+
+    @abc.abstractmethod
+    async def upload_file(self, local_path, remote_path):
+        """Uploads a file from the local path to the remote path."""
+        pass
+
+    @abc.abstractmethod
+    async def delete_file(self, path):
+        """Deletes a file at the given path."""
+        pass
+
+    @abc.abstractmethod
+    async def create_folder(self, path):
+        """Creates a folder at the given path."""
+        pass
+
+    async def move_file(self, source_path, destination_path):
+        """Moves (renames) a file or folder within the connector's storage."""
+        raise NotImplementedError(f"{type(self).__name__} does not support moves")
+
+    async def copy_file(self, source_path, destination_path):
+        """Copies a file within the connector's storage, without a transfer."""
+        raise NotImplementedError(f"{type(self).__name__} does not support copies")
+
+    async def create_folders(self, paths):
+        """Creates several folders whose parents already exist, concurrently."""
+        await asyncio.gather(*(self.create_folder(path) for path in paths))
+
+    async def delete_files(self, paths):
+        """Deletes several files or folders concurrently."""
+        await asyncio.gather(*(self.delete_file(path) for path in paths))
+
+    async def start_upload(self, local_path, remote_path):
+        """Transfers a file, possibly leaving its commit to commit_uploads.
+
+        Returns:
+            An opaque staged upload, or None if the file is already uploaded.
+        """
+        await self.upload_file(local_path, remote_path)
+        return None
+
+    async def commit_uploads(self, staged):
+        """Commits (remote_path, staged upload) pairs from start_upload.
+
+        Returns:
+            A dictionary mapping the remote path of every upload that could
+            not be committed to the reason.
+        """
+        return {}
+
+    async def upload_files(self, transfers):
+        """Uploads several (local_path, remote_path) pairs concurrently."""
+        await asyncio.gather(
+            *(
+                self.upload_file(local_path, remote_path)
+                for local_path, remote_path in transfers
+            )
+        )
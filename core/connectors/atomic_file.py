@@ -0,0 +1,73 @@
+import functools
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+
+# Assumed where the process umask cannot be read (see _umask)
+DEFAULT_UMASK = 0o022
+
+
+@contextmanager
+def atomic_write(path, fsync=False):
+    """Writes a file through a temporary file in the same directory.
+
+    The temporary file is renamed over ``path`` only once the block finished
+    without raising, so readers (and crashes) never observe a partially
+    written file at the final path.
+
+    Args:
+        path: The final path of the file.
+        fsync: If True, flush the data to disk before renaming.
+
+    Yields:
+        A binary file object to write to.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".part"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.chmod(temp_path, _file_mode(path))
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _file_mode(path):
+    """Returns the permissions to give the file written to ``path``.
+
+    An existing file keeps its mode; a new one gets the mode open() would
+    have given it (mkstemp creates files readable by their owner only).
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_umask()
+
+
+@functools.lru_cache(maxsize=None)
+def _umask():
+    """Returns the process umask, read from /proc/self/status.
+
+    os.umask can only be queried by setting it, which would briefly change
+    the mode of files created by other threads. Where /proc is not available
+    DEFAULT_UMASK is assumed.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    return DEFAULT_UMASK
@@ -0,0 +1,110 @@
+import asyncio
+import functools
+
+from core.connectors.async_file_sync_interface import AsyncFileSyncInterface
+from core.connectors.worker_pool import get_worker_pool
+
+DEFAULT_MAX_THREADS = 16
+
+
+class BlockingConnectorAdapter(AsyncFileSyncInterface):
+    """Exposes a blocking FileSyncInterface connector as an async one.
+
+    Each call runs on the connector's shared worker pool (see
+    get_worker_pool), whose size is capped by the wrapped connector's
+    max_concurrency, so a connector that is not thread-safe
+    (max_concurrency = 1) is only ever called from one thread at a time,
+    however many coroutines are waiting on it. The pool outlives the
+    adapter's runs, so per-thread clients are built once. Batch methods are
+    forwarded as a whole so the connector's batch endpoints are still used.
+    """
+
+    def __init__(self, connector, max_threads=DEFAULT_MAX_THREADS):
+        """Initializes the adapter.
+
+        Args:
+            connector: The FileSyncInterface connector to wrap.
+            max_threads: The maximum number of threads, further capped by the
+                connector's max_concurrency.
+        """
+        self.connector = connector
+        self.max_concurrency = max(
+            1, min(max_threads, getattr(connector, "max_concurrency", 1))
+        )
+        self.batch_size = getattr(connector, "batch_size", 1)
+        self.content_hash_algorithm = getattr(
+            connector, "content_hash_algorithm", None
+        )
+        self.supports_move = getattr(connector, "supports_move", False)
+        self._executor = None
+
+    def _run(self, function, *args):
+        """Runs a blocking connector method on the adapter's thread pool."""
+        if self._executor is None:
+            self._executor = get_worker_pool(self.connector, self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._executor, functools.partial(function, *args))
+
+    def configure(self, options):
+        """Applies per-task tuning options to the wrapped connector."""
+        self.connector.configure(options)
+
+    async def get_file_list(self, path):
+        """Returns a list of files and folders at the given path."""
+        return await self._run(self.connector.get_file_list, path)
+
+    async def get_file_entries(self, path):
+        """Returns the entries at the given path together with their metadata."""
+        return await self._run(
+            lambda: list(self.connector.get_file_entries(path))
+        )
+
+    async def list_tree(self, path):
+        """Returns every file and folder below the given path."""
+        # Connectors implement list_tree with their cheapest listing strategy
+        # (cursors, change feeds), so it runs as one blocking call
+        return await self._run(lambda: list(self.connector.list_tree(path)))
+
+    async def download_file(self, remote_path, local_path):
+        """Downloads a file from the remote path to the local path."""
+        await self._run(self.connector.download_file, remote_path, local_path)
+
+    async def upload_file(self, local_path, remote_path):
+        """Uploads a file from the local path to the remote path."""
+        await self._run(self.connector.upload_file, local_path, remote_path)
+
+    async def delete_file(self, path):
+        """Deletes a file at the given path."""
+        await self._run(self.connector.delete_file, path)
+
+    async def create_folder(self, path):
+        """Creates a folder at the given path."""
+        await self._run(self.connector.create_folder, path)
+
+    async def move_file(self, source_path, destination_path):
+        """Moves (renames) a file or folder within the connector's storage."""
+        await self._run(self.connector.move_file, source_path, destination_path)
+
+    async def copy_file(self, source_path, destination_path):
+        """Copies a file within the connector's storage, without a transfer."""
+        await self._run(self.connector.copy_file, source_path, destination_path)
+
+    async def create_folders(self, paths):
+        """Creates several folders in one blocking batch call."""
+        await self._run(self.connector.create_folders, paths)
+
+    async def delete_files(self, paths):
+        """Deletes several files or folders in one blocking batch call."""
+        await self._run(self.connector.delete_files, paths)
+
+    async def upload_files(self, transfers):
+        """Uploads several (local_path, remote_path) pairs in one blocking call."""
+        await self._run(self.connector.upload_files, transfers)
+
+    async def start_upload(self, local_path, remote_path):
+        """Transfers a file, possibly leaving its commit to commit_uploads."""
+        return await self._run(self.connector.start_upload, local_path, remote_path)
+
+    async def commit_uploads(self, staged):
+        """Commits staged uploads; returns {remote_path: reason} for failures."""
+        return await self._run(self.connector.commit_uploads, staged)
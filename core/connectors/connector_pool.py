@@ -0,0 +1,55 @@
+import threading
+
+from core.connectors.registry import get_connector_class, uri_scheme
+
+
+class ConnectorPool:
+    """Creates connectors that share their accounts across tasks.
+
+    Every task still gets its own connector, since connectors hold per-task
+    tuning options (see FileSyncInterface.configure). What is expensive is
+    shared instead: the object returned by the connector class's
+    create_account, e.g. an authenticated client and its pooled keep-alive
+    connections (DropboxAccount), or the credentials and per-thread services
+    (GoogleDriveAccount). Accounts are created when the first connector
+    needs them, so loading many tasks neither re-reads the credentials nor
+    opens connections once per task.
+
+    Connector classes are looked up by URI scheme in the connector registry
+    (core.connectors.registry), which imports them on first use.
+    """
+
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+        self._accounts = {}
+        self._lock = threading.Lock()
+
+    def create_connector(self, destination):
+        """Creates a connector instance based on the destination URI.
+
+        Raises:
+            ValueError: If no connector is registered for the URI's scheme.
+        """
+        scheme = uri_scheme(destination)
+        connector_class = get_connector_class(scheme)
+        account = self._get_account(
+            scheme, lambda: connector_class.create_account(self.config_manager)
+        )
+        return connector_class.from_config(self.config_manager, account)
+
+    def close(self):
+        """Releases the connections held by the accounts."""
+        with self._lock:
+            accounts = list(self._accounts.values())
+            self._accounts.clear()
+        for account in accounts:
+            close = getattr(account, "close", None)
+            if close is not None:
+                close()
+
+    def _get_account(self, key, create):
+        """Returns the account stored under a key, creating it on first use."""
+        with self._lock:
+            if key not in self._accounts:
+                self._accounts[key] = create()
+            return self._accounts[key]
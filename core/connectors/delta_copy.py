@@ -0,0 +1,87 @@
+import os
+import shutil
+
+DEFAULT_DELTA_THRESHOLD = 64 * 1024 * 1024
+DEFAULT_DELTA_BLOCK_SIZE = 1024 * 1024
+
+
+def delta_copy(source_path, destination_path, block_size=DEFAULT_DELTA_BLOCK_SIZE):
+    """Brings an existing destination file in line with a source file in place.
+
+    Both files are read block by block at the same offsets and only the
+    blocks that differ are written, followed by a truncate to the source
+    size. For large files that changed in a few places (VM images, database
+    dumps) this turns a full rewrite into a handful of small writes.
+
+    Unlike a signature exchange (rsync), both copies are local, so blocks are
+    compared byte for byte instead of through weak/strong checksums. Content
+    that shifted (an insertion near the start of the file) makes every later
+    block differ, which costs the same writes as a plain copy.
+
+    The destination is rewritten in place, so an interrupted copy leaves a
+    file that is neither the old nor the new version; the next sync repairs
+    it since the manifest is only updated after a successful copy.
+
+    Args:
+        source_path: The file to copy from.
+        destination_path: The existing file to update.
+        block_size: The comparison granularity in bytes.
+
+    Returns:
+        The number of bytes written to the destination.
+
+    Raises:
+        OSError: If either file cannot be read or the destination written.
+    """
+    source_buffer = bytearray(block_size)
+    destination_buffer = bytearray(block_size)
+    written = 0
+    offset = 0
+    with open(source_path, "rb", buffering=0) as source, open(
+        destination_path, "r+b", buffering=0
+    ) as destination:
+        while True:
+            count = source.readinto(source_buffer)
+            if not count:
+                break
+            destination_count = destination.readinto(destination_buffer)
+            if count == block_size and destination_count == block_size:
+                # Comparing whole bytearrays is a memcmp; slices would copy
+                same = source_buffer == destination_buffer
+            else:
+                same = (
+                    count == destination_count
+                    and source_buffer[:count] == destination_buffer[:count]
+                )
+            if not same:
+                destination.seek(offset)
+                destination.write(memoryview(source_buffer)[:count])
+                written += count
+            offset += count
+        destination.truncate(offset)
+    shutil.copystat(source_path, destination_path)
+    return written
+
+
+def should_delta_copy(source_path, destination_path, threshold):
+    """Checks whether delta_copy is worthwhile for a pair of files.
+
+    Args:
+        source_path: The file to copy from.
+        destination_path: The file to copy to.
+        threshold: The minimum size, in bytes, of both files. None disables
+            delta copies altogether.
+    """
+    if threshold is None:
+        return False
+    try:
+        source_stat = os.stat(source_path)
+        destination_stat = os.stat(destination_path)
+    except OSError:
+        return False
+    if (source_stat.st_dev, source_stat.st_ino) == (
+        destination_stat.st_dev,
+        destination_stat.st_ino,
+    ):
+        return False
+    return source_stat.st_size >= threshold and destination_stat.st_size >= threshold
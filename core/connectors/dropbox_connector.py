@@ -1,42 +1,113 @@
+import os
+import threading
+import time
 import dropbox
+import requests
 from contextlib import contextmanager
+from datetime import timezone
 from core.connectors.file_sync_interface import (
     FileSyncInterface,
     FileSynchronizationError,
+    PathNotFoundError,
 )
+from core.connectors.atomic_file import atomic_write
+from core.connectors.listing_cache import ListingCache
+from core.connectors.rate_limiter import RETRYABLE_STATUS_CODES, get_rate_limiter
 
+# Files up to this size go up in one files_upload request (limit: 150 MB)
+DEFAULT_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+# Upload session chunks must be a multiple of 4 MiB
+UPLOAD_CHUNK_UNIT = 4 * 1024 * 1024
+DEFAULT_UPLOAD_CHUNK_SIZE = 2 * UPLOAD_CHUNK_UNIT
+MAX_SINGLE_UPLOAD = 150 * 1024 * 1024
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Entry limit of the delete, create-folder and upload-finish batch endpoints
+MAX_BATCH_SIZE = 1000
+BATCH_POLL_INTERVAL = 0.5
+MAX_BATCH_POLL_INTERVAL = 5
+# Keep-alive connections in the HTTP session shared by an account's connectors
+MAX_POOL_CONNECTIONS = 16
+
+
+class DropboxAccount:
+    """The authenticated Dropbox client shared by the connectors of one app.
+
+    Connectors created for different tasks use the same dropbox.Dropbox
+    client, whose requests session keeps up to MAX_POOL_CONNECTIONS
+    connections alive, instead of each opening (and TLS-handshaking) its
+    own. Authorization happens in one place, under a lock, so concurrent
+    first calls do not each start an OAuth flow.
+    """
 
-class DropboxConnector(FileSyncInterface):
     def __init__(self, config_manager):
+        """Initializes the account; the client is created on first use.
+
+        Raises:
+            FileSynchronizationError: If the app key or secret is missing.
+        """
         self.config_manager = config_manager
-        self.dropbox_app_key = self.config_manager.get_config("dropbox_app_key")
-        self.dropbox_app_secret = self.config_manager.get_config("dropbox_app_secret")
-        self.dropbox_access_token = self.config_manager.get_config(
-            "dropbox_access_token"
-        )
+        self.app_key = self.config_manager.get_config("dropbox_app_key")
+        self.app_secret = self.config_manager.get_config("dropbox_app_secret")
 
-        if self.dropbox_app_key is None or self.dropbox_app_secret is None:
+        if self.app_key is None or self.app_secret is None:
             raise FileSynchronizationError(
                 "Dropbox App Key and App Secret must be configured."
             )
 
-        self.dbx = (
-            dropbox.Dropbox(self.dropbox_access_token)
-            if self.dropbox_access_token
-            else None
-        )
+        self._client = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def current_client(self):
+        """The client in use, or None if none was created yet."""
+        return self._client
+
+    def client(self):
+        """Returns the shared client, authorizing the app if needed."""
+        with self._lock:
+            if self._client is None:
+                access_token = self.config_manager.get_config("dropbox_access_token")
+                if not access_token:
+                    access_token = self._authorize()
+                if self._session is None:
+                    self._session = dropbox.create_session(
+                        max_connections=MAX_POOL_CONNECTIONS
+                    )
+                # Retries are left to the rate limiter
+                self._client = dropbox.Dropbox(
+                    access_token,
+                    max_retries_on_error=0,
+                    max_retries_on_rate_limit=0,
+                    session=self._session,
+                )
+            return self._client
+
+    def invalidate(self, client=None):
+        """Forgets a client whose access token was rejected.
+
+        The stored token is deleted so the next call authorizes again. If
+        another thread already replaced the client, nothing happens.
 
-    def _ensure_dropbox_client(self):
-        """Ensure that the Dropbox client is initialized."""
-        if self.dbx is None:
-            self.dropbox_access_token = self._get_dropbox_access_token()
-            self.dbx = dropbox.Dropbox(self.dropbox_access_token)
+        Args:
+            client: The client that failed, or None for the current one.
+        """
+        with self._lock:
+            if client is None or client is self._client:
+                self.config_manager.delete_config("dropbox_access_token")
+                self._client = None
 
-    def _get_dropbox_access_token(self):
+    def close(self):
+        """Closes the pooled HTTP connections."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            self._client = None
+
+    def _authorize(self):
         """Guide the user through Dropbox OAuth flow and get the access token."""
-        flow = dropbox.DropboxOAuth2FlowNoRedirect(
-            self.dropbox_app_key, self.dropbox_app_secret
-        )
+        flow = dropbox.DropboxOAuth2FlowNoRedirect(self.app_key, self.app_secret)
         authorize_url = flow.start()
 
         print(f"1. Go to: {authorize_url}")
@@ -53,6 +124,79 @@ class DropboxConnector(FileSyncInterface):
         except Exception as e:
             raise FileSynchronizationError(f"Error during Dropbox OAuth flow: {e}")
 
+
+class DropboxConnector(FileSyncInterface):
+    # Writes to one namespace contend for a lock server-side; keep this modest
+    max_concurrency = 4
+    batch_size = MAX_BATCH_SIZE
+    content_hash_algorithm = "dropbox"
+    supports_move = True
+
+    def __init__(self, config_manager, account=None):
+        """Initializes the connector.
+
+        Args:
+            config_manager: The ConfigurationManager with the Dropbox settings.
+            account: The DropboxAccount to share with other connectors. A
+                private one is created if omitted.
+        """
+        self.config_manager = config_manager
+        self.account = account or DropboxAccount(config_manager)
+        self.rate_limiter = get_rate_limiter(
+            self.config_manager, "dropbox", self.max_concurrency
+        )
+        self.configure({})
+
+        # Tree listings are served from a local snapshot kept current with
+        # list_folder cursors, unless disabled in the configuration.
+        self.listing_cache = (
+            ListingCache.open(self.config_manager.get_state_dir(), "dropbox-listing")
+            if self.config_manager.get_config("dropbox_incremental_listing", True)
+            else None
+        )
+
+    @classmethod
+    def create_account(cls, config_manager):
+        """Creates the DropboxAccount shared by the connectors of a ConnectorPool."""
+        return DropboxAccount(config_manager)
+
+    @classmethod
+    def from_config(cls, config_manager, account=None):
+        """Creates a connector using a shared account."""
+        return cls(config_manager, account)
+
+    def configure(self, options):
+        """Reads the upload and download tuning options of a task.
+
+        Understood keys are "upload_threshold", "upload_chunk_size",
+        "download_chunk_size" and "download_fsync".
+        """
+        self.upload_threshold = min(
+            options.get("upload_threshold", DEFAULT_UPLOAD_THRESHOLD),
+            MAX_SINGLE_UPLOAD,
+        )
+        chunk_size = options.get("upload_chunk_size", DEFAULT_UPLOAD_CHUNK_SIZE)
+        self.upload_chunk_size = max(
+            UPLOAD_CHUNK_UNIT, chunk_size - chunk_size % UPLOAD_CHUNK_UNIT
+        )
+        self.download_chunk_size = options.get(
+            "download_chunk_size", DEFAULT_DOWNLOAD_CHUNK_SIZE
+        )
+        self.download_fsync = options.get("download_fsync", False)
+
+    @property
+    def dbx(self):
+        """The account's Dropbox client, authorized on first use."""
+        return self.account.client()
+
+    def _call(self, function, *args, **kwargs):
+        """Calls a Dropbox SDK method through the shared rate limiter.
+
+        Rate-limit responses, 5xx responses and connection errors are retried
+        with backoff; everything else is raised at once.
+        """
+        return self.rate_limiter.call(function, _classify_error, *args, **kwargs)
+
     def _format_path(self, path):
         """Format the path for Dropbox API calls."""
         return path if path.startswith("/") else "/" + path
@@ -60,79 +204,401 @@ class DropboxConnector(FileSyncInterface):
     @contextmanager
     def _handle_dropbox_errors(self, message="Dropbox API error"):
         """Handle common Dropbox API errors."""
+        client = self.account.current_client
         try:
             yield
         except dropbox.exceptions.AuthError as e:
-            self.config_manager.delete_config("dropbox_access_token")
-            self.dbx = None
+            self.account.invalidate(client)
             raise FileSynchronizationError(
                 f"{message}: Dropbox authentication error: {e}"
             )
         except dropbox.exceptions.BadInputError as e:
             raise FileSynchronizationError(f"{message}: Dropbox bad input error: {e}")
         except dropbox.exceptions.ApiError as e:
+            if _is_not_found(e.error):
+                raise PathNotFoundError(f"{message}: {e.error}")
             raise FileSynchronizationError(f"{message}: {e.error}")
         except Exception as e:
             raise FileSynchronizationError(f"{message}: {e}")
 
     def get_file_list(self, path):
         """Returns a list of files and folders at the given path."""
-        self._ensure_dropbox_client()
+        return [
+            {"name": entry["name"], "type": entry["type"]}
+            for entry in self.get_file_entries(path)
+        ]
+
+    def get_file_entries(self, path):
+        """Returns the entries at the given path with size, mtime and content hash."""
         formatted_path = self._format_path(path)
         entries = []
 
         with self._handle_dropbox_errors("Error listing Dropbox path"):
-            result = self.dbx.files_list_folder(formatted_path, recursive=False)
+            result = self._call(
+                self.dbx.files_list_folder, formatted_path, recursive=False
+            )
             for entry in result.entries:
-                entry_type = (
-                    "folder"
-                    if isinstance(entry, dropbox.files.FolderMetadata)
-                    else "file"
-                )
-                entries.append({"name": entry.name, "type": entry_type})
+                entries.append(self._metadata_to_entry(entry))
 
         return entries
 
+    def list_tree(self, path):
+        """Yields every file and folder below the given path.
+
+        The first listing of a root is one recursive files_list_folder call
+        paged with files_list_folder_continue. Its cursor is stored in the
+        listing cache, and later listings only fetch the changes since that
+        cursor and serve the tree from the updated local snapshot.
+        """
+        root = self._format_path(path).rstrip("/")
+
+        if self.listing_cache is None:
+            with self._handle_dropbox_errors(f"Error listing Dropbox tree: {path}"):
+                result = self._call(self.dbx.files_list_folder, root, recursive=True)
+                while True:
+                    for metadata in result.entries:
+                        entry = self._tree_entry(root, metadata)
+                        if entry is not None:
+                            yield entry
+                    if not result.has_more:
+                        break
+                    result = self._call(
+                        self.dbx.files_list_folder_continue, result.cursor
+                    )
+            return
+
+        with self._handle_dropbox_errors(f"Error listing Dropbox tree: {path}"):
+            self._refresh_listing_cache(root)
+            entries = list(self.listing_cache.iter_entries(root))
+        for entry in entries:
+            del entry["key"]
+            yield entry
+
+    def _refresh_listing_cache(self, root):
+        """Brings the cached snapshot of a root up to date.
+
+        Only the delta since the stored cursor is fetched. Without a cursor,
+        or when Dropbox asks for a reset, the root is listed from scratch.
+        """
+        cursor = self.listing_cache.get_cursor(root)
+        result = None
+        if cursor is not None:
+            try:
+                result = self._call(self.dbx.files_list_folder_continue, cursor)
+            except dropbox.exceptions.ApiError as e:
+                if not (
+                    isinstance(e.error, dropbox.files.ListFolderContinueError)
+                    and e.error.is_reset()
+                ):
+                    raise
+        update = self.listing_cache.begin(root)
+        if result is None:
+            update.reset()
+            result = self._call(self.dbx.files_list_folder, root, recursive=True)
+
+        # Changes are kept in memory while paging and written at the end
+        while True:
+            for metadata in result.entries:
+                self._apply_listing_change(update, root, metadata)
+            if not result.has_more:
+                break
+            result = self._call(self.dbx.files_list_folder_continue, result.cursor)
+        update.commit(result.cursor)
+
+    def _apply_listing_change(self, update, root, metadata):
+        """Applies one entry of a list_folder result to a ListingUpdate."""
+        if isinstance(metadata, dropbox.files.DeletedMetadata):
+            update.delete(
+                metadata.path_lower, descendants_prefix=metadata.path_lower + "/"
+            )
+            return
+        entry = self._tree_entry(root, metadata)
+        if entry is not None:
+            update.upsert(metadata.path_lower, entry)
+
+    def _tree_entry(self, root, metadata):
+        """Converts metadata from a recursive listing into a tree entry.
+
+        Returns None for the root folder itself and for deleted entries.
+        """
+        if isinstance(metadata, dropbox.files.DeletedMetadata):
+            return None
+        relative_path = metadata.path_display[len(root) :].lstrip("/")
+        if not relative_path:
+            return None
+        entry = self._metadata_to_entry(metadata)
+        entry["path"] = relative_path
+        return entry
+
+    def _metadata_to_entry(self, metadata):
+        """Converts Dropbox metadata into a listing dictionary."""
+        if isinstance(metadata, dropbox.files.FolderMetadata):
+            return {"name": metadata.name, "type": "folder"}
+        modified = metadata.server_modified.replace(tzinfo=timezone.utc)
+        return {
+            "name": metadata.name,
+            "type": "file",
+            "size": metadata.size,
+            "mtime_ns": int(modified.timestamp()) * 1_000_000_000,
+            "hash": metadata.content_hash,
+        }
+
     def download_file(self, remote_path, local_path):
-        """Downloads a file from Dropbox to the local path."""
-        self._ensure_dropbox_client()
+        """Downloads a file from Dropbox to the local path.
+
+        The response is streamed into a temporary file that replaces the
+        local path only once the download is complete.
+        """
         formatted_remote_path = self._format_path(remote_path)
 
         with self._handle_dropbox_errors(
             f"Error downloading file from Dropbox: {remote_path}"
         ):
-            metadata, response = self.dbx.files_download(formatted_remote_path)
-            with open(local_path, "wb") as f:
-                f.write(response.content)
+            metadata, response = self._call(
+                self.dbx.files_download, formatted_remote_path
+            )
+            try:
+                with atomic_write(local_path, fsync=self.download_fsync) as f:
+                    for chunk in response.iter_content(self.download_chunk_size):
+                        self.rate_limiter.throttle_bytes(len(chunk))
+                        f.write(chunk)
+            finally:
+                response.close()
 
     def upload_file(self, local_path, remote_path):
         """Uploads a file from the local path to Dropbox."""
-        self._ensure_dropbox_client()
         formatted_remote_path = self._format_path(remote_path)
 
         with self._handle_dropbox_errors(
             f"Error uploading file to Dropbox: {remote_path}"
         ):
             with open(local_path, "rb") as f:
-                file_data = f.read()
-                self.dbx.files_upload(
-                    file_data,
-                    formatted_remote_path,
-                    mode=dropbox.files.WriteMode.overwrite,
+                size = os.fstat(f.fileno()).st_size
+                if size <= self.upload_threshold:
+                    data = f.read()
+                    self.rate_limiter.throttle_bytes(len(data))
+                    self._call(
+                        self.dbx.files_upload,
+                        data,
+                        formatted_remote_path,
+                        mode=dropbox.files.WriteMode.overwrite,
+                    )
+                else:
+                    self._upload_in_chunks(f, size, formatted_remote_path)
+
+    def _upload_in_chunks(self, f, size, formatted_remote_path):
+        """Uploads an open file through an upload session.
+
+        Every chunk is read with readinto into one buffer allocated per
+        upload, and the filled part of it is sent, so only one chunk is held
+        in memory at a time, whatever the file size, and no new bytes object
+        is created per chunk.
+        """
+        view = memoryview(bytearray(self.upload_chunk_size))
+        chunk = view[: f.readinto(view)]
+        self.rate_limiter.throttle_bytes(len(chunk))
+        session = self._call(self.dbx.files_upload_session_start, chunk)
+        cursor = dropbox.files.UploadSessionCursor(
+            session_id=session.session_id, offset=len(chunk)
+        )
+        commit = dropbox.files.CommitInfo(
+            path=formatted_remote_path, mode=dropbox.files.WriteMode.overwrite
+        )
+
+        while True:
+            chunk = view[: f.readinto(view)]
+            self.rate_limiter.throttle_bytes(len(chunk))
+            if cursor.offset + len(chunk) >= size or not chunk:
+                self._call(
+                    self.dbx.files_upload_session_finish, chunk, cursor, commit
                 )
+                return
+            self._call(self.dbx.files_upload_session_append_v2, chunk, cursor)
+            cursor.offset += len(chunk)
 
     def delete_file(self, path):
         """Deletes a file or folder from Dropbox."""
-        self._ensure_dropbox_client()
         formatted_path = self._format_path(path)
 
         with self._handle_dropbox_errors(f"Error deleting from Dropbox: {path}"):
-            self.dbx.files_delete_v2(formatted_path)
+            self._call(self.dbx.files_delete_v2, formatted_path)
 
     def create_folder(self, path):
         """Creates a folder in Dropbox."""
-        self._ensure_dropbox_client()
         formatted_path = self._format_path(path)
 
         with self._handle_dropbox_errors(f"Error creating folder in Dropbox: {path}"):
-            self.dbx.files_create_folder_v2(formatted_path)
+            self._call(self.dbx.files_create_folder_v2, formatted_path)
+
+    def move_file(self, source_path, destination_path):
+        """Moves a file or folder within Dropbox with files_move_v2."""
+
+        with self._handle_dropbox_errors(
+            f"Error moving in Dropbox: {source_path} -> {destination_path}"
+        ):
+            self._call(
+                self.dbx.files_move_v2,
+                self._format_path(source_path),
+                self._format_path(destination_path),
+            )
+
+    def copy_file(self, source_path, destination_path):
+        """Copies a file within Dropbox with files_copy_v2."""
+
+        with self._handle_dropbox_errors(
+            f"Error copying in Dropbox: {source_path} -> {destination_path}"
+        ):
+            self._call(
+                self.dbx.files_copy_v2,
+                self._format_path(source_path),
+                self._format_path(destination_path),
+            )
+
+    def delete_files(self, paths):
+        """Deletes several files or folders with files_delete_batch."""
+        for start in range(0, len(paths), MAX_BATCH_SIZE):
+            chunk = paths[start : start + MAX_BATCH_SIZE]
+            with self._handle_dropbox_errors("Error deleting from Dropbox"):
+                launch = self._call(
+                    self.dbx.files_delete_batch,
+                    [
+                        dropbox.files.DeleteArg(self._format_path(path))
+                        for path in chunk
+                    ],
+                )
+                result = self._wait_for_batch(launch, self.dbx.files_delete_batch_check)
+            self._raise_batch_failures(
+                chunk, result.entries, "Error deleting from Dropbox"
+            )
+
+    def create_folders(self, paths):
+        """Creates several folders with files_create_folder_batch."""
+        for start in range(0, len(paths), MAX_BATCH_SIZE):
+            chunk = paths[start : start + MAX_BATCH_SIZE]
+            with self._handle_dropbox_errors("Error creating folder in Dropbox"):
+                launch = self._call(
+                    self.dbx.files_create_folder_batch,
+                    [self._format_path(path) for path in chunk],
+                )
+                result = self._wait_for_batch(
+                    launch, self.dbx.files_create_folder_batch_check
+                )
+            self._raise_batch_failures(
+                chunk, result.entries, "Error creating folder in Dropbox"
+            )
+
+    def start_upload(self, local_path, remote_path):
+        """Sends a small file in its own closed upload session.
+
+        The session is committed later by commit_uploads, together with the
+        other small files, with one files_upload_session_finish_batch_v2 call,
+        which avoids contending for the namespace lock once per file. Files
+        above the upload threshold are uploaded completely by upload_file.
+
+        Returns:
+            The UploadSessionFinishArg to commit, or None for a large file.
+        """
+        with self._handle_dropbox_errors(
+            f"Error uploading file to Dropbox: {remote_path}"
+        ):
+            with open(local_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size <= self.upload_threshold:
+                    data = f.read()
+                else:
+                    data = None
+            if data is not None:
+                self.rate_limiter.throttle_bytes(len(data))
+                session = self._call(
+                    self.dbx.files_upload_session_start, data, close=True
+                )
+                cursor = dropbox.files.UploadSessionCursor(
+                    session_id=session.session_id, offset=len(data)
+                )
+                commit = dropbox.files.CommitInfo(
+                    path=self._format_path(remote_path),
+                    mode=dropbox.files.WriteMode.overwrite,
+                )
+                return dropbox.files.UploadSessionFinishArg(cursor, commit)
+        self.upload_file(local_path, remote_path)
+        return None
+
+    def commit_uploads(self, staged):
+        """Commits small files sent by start_upload with one batch call."""
+        with self._handle_dropbox_errors("Error uploading files to Dropbox"):
+            result = self._call(
+                self.dbx.files_upload_session_finish_batch_v2,
+                [entry for _, entry in staged],
+            )
+        return {
+            path: str(entry.get_failure())
+            for (path, _), entry in zip(staged, result.entries)
+            if entry.is_failure()
+        }
+
+    def _wait_for_batch(self, launch, check):
+        """Returns the result of a batch call, polling its async job if needed.
+
+        Args:
+            launch: The *BatchLaunch returned by the batch call.
+            check: The matching *_batch_check method.
+        """
+        if launch.is_complete():
+            return launch.get_complete()
+
+        job_id = launch.get_async_job_id()
+        delay = BATCH_POLL_INTERVAL
+        while True:
+            time.sleep(delay)
+            status = self._call(check, job_id)
+            if status.is_complete():
+                return status.get_complete()
+            if status.is_failed():
+                raise FileSynchronizationError(
+                    f"Dropbox batch job failed: {status.get_failed()}"
+                )
+            delay = min(delay * 2, MAX_BATCH_POLL_INTERVAL)
+
+    def _raise_batch_failures(self, paths, entries, message):
+        """Raises one error listing every failed entry of a batch result."""
+        failures = _batch_failures(paths, entries)
+        if failures:
+            raise FileSynchronizationError(f"{message}: {'; '.join(failures)}")
+
+
+def _batch_failures(paths, entries):
+    """Returns "<path>: <failure>" for every failed entry of a batch result."""
+    return [
+        f"{path}: {entry.get_failure()}"
+        for path, entry in zip(paths, entries)
+        if entry.is_failure()
+    ]
+
+
+def _is_not_found(error):
+    """Returns True if an ApiError's error union reports a missing path."""
+    if not (hasattr(error, "is_path") and error.is_path()):
+        return False
+    lookup = error.get_path()
+    return hasattr(lookup, "is_not_found") and lookup.is_not_found()
+
+
+def _classify_error(error):
+    """Tells the rate limiter whether a Dropbox error is worth retrying.
+
+    Returns:
+        None if the error is permanent, else a (throttled, retry_after) pair.
+    """
+    if isinstance(error, dropbox.exceptions.RateLimitError):
+        # backoff carries the Retry-After header of the response
+        return True, error.backoff
+    if isinstance(error, dropbox.exceptions.InternalServerError):
+        return False, None
+    if isinstance(error, dropbox.exceptions.HttpError):
+        if error.status_code not in RETRYABLE_STATUS_CODES:
+            return None
+        return error.status_code == 429, None
+    if isinstance(
+        error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    ):
+        return False, None
+    return None
@@ -0,0 +1,206 @@
+import errno
+import os
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# _IOW(0x94, 9, int) from linux/fs.h
+FICLONE = 0x40049409
+READ_WRITE_CHUNK_SIZE = 1024 * 1024
+
+# errno values meaning "this strategy does not work here", as opposed to an
+# actual I/O error
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.EBADF,
+    errno.EPERM,
+}
+
+# (source st_dev, destination st_dev) -> index into _STRATEGIES
+_strategy_cache = {}
+_strategy_lock = threading.Lock()
+
+
+class _Unsupported(Exception):
+    """Raised by a copy strategy that cannot handle a pair of files."""
+
+
+def copy_file(source_path, destination_path):
+    """Copies the contents of a file using the cheapest mechanism available.
+
+    Strategies are tried in order: a FICLONE reflink (instant copy-on-write
+    clone on btrfs/XFS), os.copy_file_range and os.sendfile (both copy inside
+    the kernel), and finally plain pread/pwrite. All but the reflink copy
+    only the data regions reported by SEEK_DATA/SEEK_HOLE, so sparse files
+    stay sparse. The first strategy that works for a pair of filesystems is
+    remembered, so later copies between them skip the ones that failed.
+
+    Like shutil.copyfile, only contents are copied; use shutil.copystat for
+    the metadata.
+
+    Args:
+        source_path: The file to copy from.
+        destination_path: The file to create or overwrite.
+
+    Returns:
+        The name of the strategy that was used.
+
+    Raises:
+        shutil.SameFileError: If both paths refer to the same file.
+        OSError: If the copy fails.
+    """
+    try:
+        if os.path.samefile(source_path, destination_path):
+            raise shutil.SameFileError(
+                f"{source_path!r} and {destination_path!r} are the same file"
+            )
+    except FileNotFoundError:
+        pass
+
+    with open(source_path, "rb", buffering=0) as source, open(
+        destination_path, "wb", buffering=0
+    ) as destination:
+        source_fd = source.fileno()
+        destination_fd = destination.fileno()
+        source_stat = os.fstat(source_fd)
+        key = (source_stat.st_dev, os.fstat(destination_fd).st_dev)
+        with _strategy_lock:
+            first = _strategy_cache.get(key, 0)
+
+        for index in range(first, len(_STRATEGIES)):
+            name, strategy = _STRATEGIES[index]
+            try:
+                strategy(source_fd, destination_fd, source_stat.st_size)
+            except _Unsupported:
+                # Start over with an empty destination
+                os.ftruncate(destination_fd, 0)
+                continue
+            if index != first:
+                with _strategy_lock:
+                    _strategy_cache[key] = index
+            return name
+    # The read/write strategy never reports _Unsupported
+    raise AssertionError("unreachable")
+
+
+def _unsupported_or_raise(error, copied):
+    """Turns an OSError into _Unsupported if nothing was copied yet."""
+    if copied == 0 and error.errno in _UNSUPPORTED_ERRNOS:
+        raise _Unsupported() from error
+    raise error
+
+
+def _data_segments(fd, size):
+    """Yields (start, end) ranges of a file that contain data.
+
+    Falls back to the whole file when the filesystem (or platform) cannot
+    report holes.
+    """
+    seek_data = getattr(os, "SEEK_DATA", None)
+    seek_hole = getattr(os, "SEEK_HOLE", None)
+    if seek_data is None or seek_hole is None:
+        if size:
+            yield 0, size
+        return
+
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(fd, offset, seek_data)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                return  # Only a hole is left
+            if e.errno == errno.EINVAL and offset == 0:
+                yield 0, size
+                return
+            raise
+        end = min(os.lseek(fd, start, seek_hole), size)
+        if end <= start:
+            return
+        yield start, end
+        offset = end
+
+
+def _copy_reflink(source_fd, destination_fd, size):
+    if fcntl is None:
+        raise _Unsupported()
+    try:
+        fcntl.ioctl(destination_fd, FICLONE, source_fd)
+    except OSError as e:
+        _unsupported_or_raise(e, 0)
+
+
+def _copy_file_range(source_fd, destination_fd, size):
+    if not hasattr(os, "copy_file_range"):
+        raise _Unsupported()
+    copied = 0
+    for start, end in _data_segments(source_fd, size):
+        offset = start
+        while offset < end:
+            try:
+                count = os.copy_file_range(
+                    source_fd, destination_fd, end - offset, offset, offset
+                )
+            except OSError as e:
+                _unsupported_or_raise(e, copied)
+            if count == 0:
+                # Some filesystems report success without copying anything
+                if copied == 0:
+                    raise _Unsupported()
+                raise OSError(errno.EIO, "copy_file_range stopped early")
+            offset += count
+            copied += count
+    os.ftruncate(destination_fd, size)
+
+
+def _copy_sendfile(source_fd, destination_fd, size):
+    if not hasattr(os, "sendfile"):
+        raise _Unsupported()
+    copied = 0
+    for start, end in _data_segments(source_fd, size):
+        offset = start
+        os.lseek(destination_fd, start, os.SEEK_SET)
+        while offset < end:
+            try:
+                count = os.sendfile(destination_fd, source_fd, offset, end - offset)
+            except OSError as e:
+                _unsupported_or_raise(e, copied)
+            if count == 0:
+                if copied == 0:
+                    raise _Unsupported()
+                raise OSError(errno.EIO, "sendfile stopped early")
+            offset += count
+            copied += count
+    os.ftruncate(destination_fd, size)
+
+
+def _copy_read_write(source_fd, destination_fd, size):
+    for start, end in _data_segments(source_fd, size):
+        offset = start
+        while offset < end:
+            data = os.pread(source_fd, min(READ_WRITE_CHUNK_SIZE, end - offset), offset)
+            if not data:
+                break
+            view = memoryview(data)
+            while view:
+                written = os.pwrite(destination_fd, view, offset)
+                view = view[written:]
+                offset += written
+    os.ftruncate(destination_fd, size)
+
+
+_STRATEGIES = [
+    ("reflink", _copy_reflink),
+    ("copy_file_range", _copy_file_range),
+    ("sendfile", _copy_sendfile),
+    ("read_write", _copy_read_write),
+]
@@ -1,4 +1,5 @@
 import abc
+import os
 
 
 class FileSynchronizationError(Exception):
@@ -7,8 +8,68 @@ class FileSynchronizationError(Exception):
     pass
 
 
+class PathNotFoundError(FileSynchronizationError):
+    """Raised when the path to list or transfer does not exist."""
+
+    pass
+
+
 class FileSyncInterface(abc.ABC):
-    """Interface for file synchronization operations."""
+    """Interface for file synchronization operations.
+
+    Attributes:
+        max_concurrency: The number of operations that may safely run in
+            parallel against this connector. Sync tasks never use more
+            workers than this, whatever their "max_workers" option says.
+        batch_size: The number of operations a sync task hands to one call
+            of the batch methods (create_folders, delete_files, commit_uploads).
+        content_hash_algorithm: The core.hashing algorithm matching the "hash"
+            reported in listing entries, or None if entries carry no hash and
+            files must be hashed locally.
+        supports_move: True if move_file and copy_file are implemented, which
+            lets sync tasks turn renames into moves instead of re-uploads.
+    """
+
+    max_concurrency = 1
+    batch_size = 1
+    content_hash_algorithm = None
+    supports_move = False
+
+    @classmethod
+    def create_account(cls, config_manager):
+        """Creates the state shared by every connector of one account.
+
+        ConnectorPool calls this once per URI scheme and hands the result to
+        from_config for every task, so clients, credentials and connections
+        are not set up again for each task. Connectors without such state
+        return None.
+
+        Args:
+            config_manager: The ConfigurationManager.
+        """
+        return None
+
+    @classmethod
+    def from_config(cls, config_manager, account=None):
+        """Creates a connector for a task.
+
+        Args:
+            config_manager: The ConfigurationManager.
+            account: The object returned by create_account, shared with the
+                other connectors of the account.
+        """
+        return cls()
+
+    def configure(self, options):
+        """Applies per-task tuning options to the connector.
+
+        Called by the sync task before each run with the task's options.
+        Connectors pick the keys they understand and ignore the rest.
+
+        Args:
+            options: The task options dictionary.
+        """
+        pass
 
     @abc.abstractmethod
     def get_file_list(self, path):
@@ -26,6 +87,59 @@ class FileSyncInterface(abc.ABC):
         """
         pass
 
+    def get_file_entries(self, path):
+        """Returns the entries at the given path together with their metadata.
+
+        This is a richer variant of get_file_list and may return any iterable,
+        so that connectors can stream large folders. Besides "name" and "type",
+        each dictionary may carry any of the following keys when the
+        connector can provide them without extra requests:
+
+            - "size": The size in bytes.
+            - "mtime_ns": The modification time in nanoseconds since the epoch.
+            - "inode": The inode number (local file systems only).
+            - "mode": The st_mode bits (local file systems only).
+            - "hash": A content hash reported by the remote service.
+
+        Missing keys mean "unknown". The default implementation falls back to
+        get_file_list and therefore carries no metadata.
+
+        Args:
+            path: The path to list.
+
+        Raises:
+            FileSynchronizationError: If there is an error listing the path.
+        """
+        return self.get_file_list(path)
+
+    def list_tree(self, path):
+        """Yields every file and folder below the given path.
+
+        Entries are dictionaries like those of get_file_entries, with an
+        additional "path" key holding the "/"-separated path relative to the
+        given root. Entries come in no particular order.
+
+        The default implementation walks the tree with get_file_entries;
+        connectors that can list a whole tree in fewer requests should
+        override it.
+
+        Args:
+            path: The root of the tree to list.
+
+        Raises:
+            FileSynchronizationError: If there is an error listing the tree.
+        """
+        pending = [""]
+        while pending:
+            relative_path = pending.pop()
+            folder_path = os.path.join(path, relative_path) if relative_path else path
+            prefix = f"{relative_path}/" if relative_path else ""
+            for entry in self.get_file_entries(folder_path):
+                entry = dict(entry, path=prefix + entry["name"])
+                yield entry
+                if entry["type"] == "folder":
+                    pending.append(entry["path"])
+
     @abc.abstractmethod
     def download_file(self, remote_path, local_path):
         """Downloads a file from the remote path to the local path.
@@ -75,3 +189,132 @@ class FileSyncInterface(abc.ABC):
             FileSynchronizationError: If there is an error creating the folder.
         """
         pass
+
+    def move_file(self, source_path, destination_path):
+        """Moves (renames) a file or folder within the connector's storage.
+
+        The parent of the destination path must exist. Connectors that
+        implement this set supports_move.
+
+        Args:
+            source_path: The current path.
+            destination_path: The new path.
+
+        Raises:
+            FileSynchronizationError: If the entry could not be moved.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support moves")
+
+    def copy_file(self, source_path, destination_path):
+        """Copies a file within the connector's storage, without a transfer.
+
+        The parent of the destination path must exist. Connectors that
+        implement this set supports_move.
+
+        Args:
+            source_path: The path of the file to copy.
+            destination_path: The path of the copy.
+
+        Raises:
+            FileSynchronizationError: If the file could not be copied.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support copies")
+
+    def create_folders(self, paths):
+        """Creates several folders whose parents already exist.
+
+        Connectors that can group requests override this; the default
+        creates the folders one by one.
+
+        Args:
+            paths: The paths of the new folders.
+
+        Raises:
+            FileSynchronizationError: If any folder could not be created.
+        """
+        for path in paths:
+            self.create_folder(path)
+
+    def delete_files(self, paths):
+        """Deletes several files or folders.
+
+        Connectors that can group requests override this; the default
+        deletes the paths one by one.
+
+        Args:
+            paths: The paths to delete.
+
+        Raises:
+            FileSynchronizationError: If any path could not be deleted.
+        """
+        for path in paths:
+            self.delete_file(path)
+
+    def start_upload(self, local_path, remote_path):
+        """Transfers a file, possibly leaving its commit to commit_uploads.
+
+        Sync tasks call this once per file, in parallel, and then commit the
+        staged files together in groups of batch_size. Connectors that can
+        commit many files at once override this and commit_uploads; the
+        default uploads the file completely.
+
+        Args:
+            local_path: The path of the local file.
+            remote_path: The path to upload it to.
+
+        Returns:
+            An opaque staged upload to pass to commit_uploads, or None if the
+            file is already uploaded.
+
+        Raises:
+            FileSynchronizationError: If the file could not be transferred.
+        """
+        self.upload_file(local_path, remote_path)
+        return None
+
+    def commit_uploads(self, staged):
+        """Commits uploads staged by start_upload.
+
+        Args:
+            staged: A list of (remote_path, staged upload) pairs.
+
+        Returns:
+            A dictionary mapping the remote path of every upload that could
+            not be committed to the reason; the others are committed.
+
+        Raises:
+            FileSynchronizationError: If the commit as a whole failed.
+        """
+        return {}
+
+    def upload_files(self, transfers):
+        """Uploads several files.
+
+        The files are transferred one by one with start_upload, and the
+        staged ones are committed in groups of batch_size.
+
+        Args:
+            transfers: A list of (local_path, remote_path) pairs.
+
+        Raises:
+            FileSynchronizationError: Listing every file that could not be
+                uploaded, once the others were.
+        """
+        failures = []
+        staged = []
+        for local_path, remote_path in transfers:
+            try:
+                upload = self.start_upload(local_path, remote_path)
+            except FileSynchronizationError as e:
+                failures.append(f"{remote_path}: {e}")
+                continue
+            if upload is not None:
+                staged.append((remote_path, upload))
+        batch_size = max(1, self.batch_size)
+        for start in range(0, len(staged), batch_size):
+            failed = self.commit_uploads(staged[start : start + batch_size])
+            failures.extend(f"{path}: {reason}" for path, reason in failed.items())
+        if failures:
+            raise FileSynchronizationError(
+                f"Error uploading files: {'; '.join(failures)}"
+            )
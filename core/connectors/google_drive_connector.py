@@ -1,29 +1,105 @@
+import json
 import os
-import io
 import pickle
+import sqlite3
+import threading
+from datetime import datetime
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
-from core.connectors.file_sync_interface import FileSyncInterface, FileSynchronizationError
+from core.connectors.file_sync_interface import (
+    FileSyncInterface,
+    FileSynchronizationError,
+    PathNotFoundError,
+)
+from core.connectors.atomic_file import atomic_write
+from core.connectors.listing_cache import ListingCache
+from core.connectors.path_id_cache import PathIdCache
+from core.connectors.rate_limiter import (
+    RETRYABLE_STATUS_CODES,
+    get_rate_limiter,
+    parse_retry_after,
+)
 
 SCOPES = ["https://www.googleapis.com/auth/drive"]
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+# Only the fields the sync engine uses, to keep listing responses small
+LIST_FIELDS = "id, name, mimeType"
+ENTRY_FIELDS = "id, name, mimeType, size, modifiedTime, md5Checksum"
+MAX_PAGE_SIZE = 1000
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# Resumable upload chunks must be a multiple of 256 KiB
+UPLOAD_CHUNK_UNIT = 256 * 1024
+DEFAULT_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# Saved resumable upload session URIs, in the state directory
+UPLOAD_SESSIONS_FILE = "google-drive-upload-sessions.json"
+# Upper limit of calls per request to the batch endpoint
+MAX_BATCH_SIZE = 100
+# Keeps "'<id>' in parents or ..." queries well below the URL length limit
+PARENTS_PER_QUERY = 40
+# 403 reasons that mean "slow down" rather than "forbidden"
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+TOKEN_PATH = "token.pickle"
+
+# Serializes read-modify-write of the saved upload sessions across threads
+_upload_sessions_lock = threading.Lock()
+
+
+class GoogleDriveAccount:
+    """The Google Drive credentials shared by the connectors of one user.
+
+    The discovery service wraps an httplib2.Http, which is not thread-safe,
+    so every thread gets its own service object. It is built once per thread
+    and reused, keeping its connection alive across requests. All services
+    share one set of credentials, loaded on first use and refreshed under a
+    lock, so an expiring token is refreshed (and saved) once rather than by
+    every thread at the same time.
+    """
+
+    def __init__(self, token_path=TOKEN_PATH):
+        self.token_path = token_path
+        self.credentials = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def service(self):
+        """Returns the calling thread's Drive service."""
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = build(
+                "drive",
+                "v3",
+                credentials=self._get_credentials(),
+                cache_discovery=False,
+            )
+            self._local.service = service
+        return service
+
+    def refresh_if_needed(self):
+        """Refreshes the shared credentials if they expired or are about to."""
+        credentials = self._get_credentials()
+        if credentials.valid:
+            return
+        with self._lock:
+            if not credentials.valid:
+                credentials.refresh(Request())
+                self._save_credentials(credentials)
 
-class GoogleDriveConnector(FileSyncInterface):
-    def __init__(self, config_manager):
-        self.config_manager = config_manager
-        self.credentials = self._load_credentials()
-        self.service = build("drive", "v3", credentials=self.credentials)
+    def _get_credentials(self):
+        with self._lock:
+            if self.credentials is None:
+                self.credentials = self._load_credentials()
+            return self.credentials
 
     def _load_credentials(self):
-        """Loads credentials from the config file or initiates the OAuth flow."""
+        """Loads credentials from the token file or initiates the OAuth flow."""
         credentials = None
-        token_path = "token.pickle"  # Store token in a local file
 
-        if os.path.exists(token_path):
-            with open(token_path, "rb") as token:
+        if os.path.exists(self.token_path):
+            with open(self.token_path, "rb") as token:
                 credentials = pickle.load(token)
 
         if not credentials or not credentials.valid:
@@ -35,11 +111,99 @@ class GoogleDriveConnector(FileSyncInterface):
                 )
                 credentials = flow.run_local_server(port=0)
 
-            with open(token_path, "wb") as token:
-                pickle.dump(credentials, token)
+            self._save_credentials(credentials)
 
         return credentials
 
+    def _save_credentials(self, credentials):
+        with open(self.token_path, "wb") as token:
+            pickle.dump(credentials, token)
+
+class GoogleDriveConnector(FileSyncInterface):
+    # Each thread has its own service object (see GoogleDriveAccount)
+    max_concurrency = 4
+    batch_size = MAX_BATCH_SIZE
+    content_hash_algorithm = "md5"
+    supports_move = True
+
+    def __init__(self, config_manager, account=None):
+        """Initializes the connector.
+
+        Args:
+            config_manager: The ConfigurationManager with the Drive settings.
+            account: The GoogleDriveAccount to share with other connectors.
+                A private one is created if omitted.
+        """
+        self.config_manager = config_manager
+        self.account = account or GoogleDriveAccount()
+        # Path -> ID lookups; set a TTL if other writers share the tree
+        self.id_cache = PathIdCache(
+            max_entries=self.config_manager.get_config(
+                "google_drive_id_cache_size", 100000
+            ),
+            ttl=self.config_manager.get_config("google_drive_id_cache_ttl"),
+        )
+        self.rate_limiter = get_rate_limiter(
+            self.config_manager, "google_drive", self.max_concurrency
+        )
+        self.configure({})
+
+        # Tree listings are served from a local snapshot kept current with
+        # the Changes API, unless disabled in the configuration.
+        self.listing_cache = None
+        if self.config_manager.get_config("google_drive_incremental_listing", True):
+            self.listing_cache = ListingCache.open(
+                self.config_manager.get_state_dir(), "google-drive-listing"
+            )
+
+    @classmethod
+    def create_account(cls, config_manager):
+        """Creates the GoogleDriveAccount shared by the connectors of a ConnectorPool."""
+        return GoogleDriveAccount()
+
+    @classmethod
+    def from_config(cls, config_manager, account=None):
+        """Creates a connector using a shared account."""
+        return cls(config_manager, account)
+
+    def configure(self, options):
+        """Reads the upload and download tuning options of a task.
+
+        Understood keys are "upload_chunk_size", "download_chunk_size" and
+        "download_fsync".
+        """
+        chunk_size = options.get("upload_chunk_size", DEFAULT_UPLOAD_CHUNK_SIZE)
+        self.upload_chunk_size = max(
+            UPLOAD_CHUNK_UNIT, chunk_size - chunk_size % UPLOAD_CHUNK_UNIT
+        )
+        self.download_chunk_size = options.get(
+            "download_chunk_size", DEFAULT_DOWNLOAD_CHUNK_SIZE
+        )
+        self.download_fsync = options.get("download_fsync", False)
+
+    @property
+    def service(self):
+        """The Drive service of the calling thread."""
+        return self.account.service()
+
+    def _execute(self, request):
+        """Executes an API request through the shared rate limiter.
+
+        Rate-limit responses, 5xx responses and connection errors are retried
+        with backoff; everything else is raised at once.
+        """
+        self.account.refresh_if_needed()
+        return self.rate_limiter.call(request.execute, _classify_error)
+
+    def _next_chunk(self, request):
+        """Transfers the next chunk of a media request through the rate limiter.
+
+        A failed chunk leaves the request in its error state, so the retry
+        resumes from the last byte the server acknowledged.
+        """
+        self.account.refresh_if_needed()
+        return self.rate_limiter.call(request.next_chunk, _classify_error)
+
     def _get_folder_id_by_path(self, path):
         """Gets the Google Drive folder ID from a path.
 
@@ -50,24 +214,25 @@ class GoogleDriveConnector(FileSyncInterface):
             The folder ID (str) or None if not found.
         """
         folder_id = "root"  # Start at the root
-        path_parts = path.split("/")
-
-        for part in path_parts:
-            if not part:
-                continue  # Skip empty parts
-
+        path_parts = [part for part in path.split("/") if part]  # Skip empty parts
+
+        # Resume from the deepest ancestor whose ID is already known
+        depth = len(path_parts)
+        while depth > 0:
+            cached_id = self.id_cache.get("/".join(path_parts[:depth]))
+            if cached_id is not None:
+                folder_id = cached_id
+                break
+            depth -= 1
+
+        for index in range(depth, len(path_parts)):
+            part = path_parts[index]
             query = (
                 f"name = '{part}' and '{folder_id}' in parents and "
                 "mimeType = 'application/vnd.google-apps.folder' and trashed = false"
             )
-            results = (
-                self.service.files()
-                .list(
-                    q=query,
-                    pageSize=10,
-                    fields="nextPageToken, files(id, name)",
-                )
-                .execute()
+            results = self._execute(
+                self.service.files().list(q=query, pageSize=1, fields="files(id)")
             )
             items = results.get("files", [])
 
@@ -75,71 +240,418 @@ class GoogleDriveConnector(FileSyncInterface):
                 return None  # Folder not found
 
             folder_id = items[0]["id"]
+            self.id_cache.put("/".join(path_parts[: index + 1]), folder_id)
 
         return folder_id
 
     def get_file_list(self, path):
         """Returns a list of files and folders at the given path."""
+        return [
+            {"name": entry["name"], "type": entry["type"], "id": entry["id"]}
+            for entry in self._iter_folder(path, LIST_FIELDS)
+        ]
+
+    def get_file_entries(self, path):
+        """Yields the entries at the given path with size, mtime and MD5 checksum.
+
+        Results are paged with the maximum page size and streamed, so folders
+        of any size are listed completely without being held in memory.
+        """
+        return self._iter_folder(path, ENTRY_FIELDS)
+
+    def _iter_folder(self, path, fields):
+        """Yields the entries of a folder, requesting only the given fields."""
         folder_id = self._get_folder_id_by_path(path)
         if folder_id is None:
-            raise FileSynchronizationError(f"Google Drive path not found: {path}")
-
-        results = (
-            self.service.files()
-            .list(
-                q=f"'{folder_id}' in parents and trashed = false",
-                pageSize=100,
-                fields="nextPageToken, files(id, name, mimeType)",
+            raise PathNotFoundError(f"Google Drive path not found: {path}")
+
+        folder_path = path.strip("/")
+        query = f"'{folder_id}' in parents and trashed = false"
+        for item in self._iter_files(query, fields):
+            entry = self._item_to_entry(item)
+            self.id_cache.put(_join_name(folder_path, entry["name"]), entry["id"])
+            yield entry
+
+    def list_tree(self, path):
+        """Yields every file and folder below the given path.
+
+        The first listing of a root walks the tree breadth-first, with paged
+        queries that cover many parent folders at once. The walk is stored in
+        the listing cache together with a Changes API start token; later
+        listings only fetch the changes since that token and resolve paths
+        from the cached ID index.
+        """
+        folder_id = self._get_folder_id_by_path(path)
+        if folder_id is None:
+            raise PathNotFoundError(f"Google Drive path not found: {path}")
+
+        root_path = path.strip("/")
+        if self.listing_cache is None:
+            paths = {folder_id: ""}
+            for item, parent_id in self._walk_tree(folder_id):
+                entry = self._item_to_entry(item)
+                entry["path"] = _join_name(paths[parent_id], item["name"])
+                if entry["type"] == "folder":
+                    paths[item["id"]] = entry["path"]
+                self.id_cache.put(_join_name(root_path, entry["path"]), entry["id"])
+                yield entry
+            return
+
+        self._refresh_listing_cache(folder_id)
+        if root_path:
+            self.id_cache.put(root_path, folder_id)
+        for entry in self._cached_tree(folder_id):
+            self.id_cache.put(_join_name(root_path, entry["path"]), entry["id"])
+            yield entry
+
+    def _walk_tree(self, folder_id):
+        """Yields (item, parent_id) for everything below a folder, level by level."""
+        level = [folder_id]
+        while level:
+            next_level = []
+            for start in range(0, len(level), PARENTS_PER_QUERY):
+                group = level[start : start + PARENTS_PER_QUERY]
+                group_ids = set(group)
+                parents = " or ".join(f"'{pid}' in parents" for pid in group)
+                query = f"({parents}) and trashed = false"
+                for item in self._iter_files(query, f"{ENTRY_FIELDS}, parents"):
+                    parent_id = next(
+                        (pid for pid in item.get("parents", []) if pid in group_ids),
+                        None,
+                    )
+                    if parent_id is None:
+                        continue
+                    yield item, parent_id
+                    if item["mimeType"] == FOLDER_MIME_TYPE:
+                        next_level.append(item["id"])
+            level = next_level
+
+    def _refresh_listing_cache(self, folder_id):
+        """Brings the cached snapshot below a folder up to date.
+
+        Only changes since the stored page token are fetched. Without a token,
+        or when Drive rejects it, the folder is walked from scratch. Changes
+        are kept in memory while Drive is paged and written in one short
+        transaction at the end.
+        """
+        try:
+            token = self.listing_cache.get_cursor(folder_id)
+            update = self.listing_cache.begin(folder_id)
+            if token is not None:
+                try:
+                    token = self._apply_changes(update, folder_id, token)
+                except HttpError as error:
+                    if error.resp.status not in (400, 404, 410):
+                        raise
+                    token = None
+            if token is None:
+                start = self._execute(self.service.changes().getStartPageToken())
+                token = start["startPageToken"]
+                update.reset()
+                for item, parent_id in self._walk_tree(folder_id):
+                    update.upsert(item["id"], self._item_to_entry(item), parent_id)
+            update.commit(token)
+        except HttpError as error:
+            raise FileSynchronizationError(
+                f"Error listing Google Drive changes: {error}"
             )
-            .execute()
-        )
-        items = results.get("files", [])
-
-        entries = []
-        for item in items:
-            entry_type = (
-                "folder"
-                if item["mimeType"] == "application/vnd.google-apps.folder"
-                else "file"
+        except sqlite3.Error as error:
+            raise FileSynchronizationError(
+                f"Error updating the Google Drive listing cache: {error}"
             )
-            entries.append({"name": item["name"], "type": entry_type, "id": item["id"]})
 
-        return entries
+    def _apply_changes(self, update, folder_id, token):
+        """Applies every change since a page token to a ListingUpdate.
+
+        Changes cover the whole Drive, so only files whose parent is the root
+        folder or a folder known to the snapshot are kept. Folders that newly
+        appear under the root (created or moved in) are walked, since Drive
+        reports only the folder itself when a subtree is moved.
+
+        Returns:
+            The token to resume from next time.
+        """
+        changed = []
+        while True:
+            response = self._execute(
+                self.service.changes().list(
+                    pageToken=token,
+                    pageSize=MAX_PAGE_SIZE,
+                    spaces="drive",
+                    includeRemoved=True,
+                    fields=(
+                        "nextPageToken, newStartPageToken, changes(fileId, removed, "
+                        f"file({ENTRY_FIELDS}, parents, trashed))"
+                    ),
+                )
+            )
+            changed.extend(response.get("changes", []))
+            if "newStartPageToken" in response:
+                token = response["newStartPageToken"]
+                break
+            token = response["nextPageToken"]
+
+        if changed:
+            # Cached paths may have moved; the listing that follows re-fills them
+            self.id_cache.clear()
+
+        pending = []
+        for change in changed:
+            item = change.get("file")
+            if change.get("removed") or item is None or item.get("trashed"):
+                update.delete(change["fileId"])
+            else:
+                pending.append(item)
+
+        # Parents may be reported after their children, so settle until stable
+        new_folders = []
+        while pending:
+            remaining = []
+            for item in pending:
+                parent_id = next(
+                    (
+                        pid
+                        for pid in item.get("parents", [])
+                        if pid == folder_id or update.get(pid) is not None
+                    ),
+                    None,
+                )
+                if parent_id is None:
+                    remaining.append(item)
+                    continue
+                known = update.get(item["id"])
+                entry = self._item_to_entry(item)
+                update.upsert(item["id"], entry, parent_id)
+                if entry["type"] == "folder" and known is None:
+                    new_folders.append(item["id"])
+            if len(remaining) == len(pending):
+                # Outside the root, or moved out of it
+                for item in remaining:
+                    update.delete(item["id"])
+                break
+            pending = remaining
+
+        for new_folder_id in new_folders:
+            for item, parent_id in self._walk_tree(new_folder_id):
+                update.upsert(item["id"], self._item_to_entry(item), parent_id)
+        return token
+
+    def _cached_tree(self, folder_id):
+        """Yields the cached entries below a folder with their resolved paths.
+
+        Entries whose parent chain no longer reaches the folder (e.g. children
+        of a removed folder) are skipped.
+        """
+        try:
+            entries = {
+                entry["key"]: entry
+                for entry in self.listing_cache.iter_entries(folder_id)
+            }
+        except sqlite3.Error as error:
+            raise FileSynchronizationError(
+                f"Error reading the Google Drive listing cache: {error}"
+            )
+        paths = {folder_id: ""}
+
+        def resolve(file_id):
+            chain = []
+            while file_id not in paths:
+                entry = entries.get(file_id)
+                if entry is None or "parent_key" not in entry:
+                    for orphan in chain:
+                        paths[orphan] = None
+                    return None
+                chain.append(file_id)
+                file_id = entry["parent_key"]
+            parent_path = paths[file_id]
+            for child in reversed(chain):
+                if parent_path is not None:
+                    parent_path = _join_name(parent_path, entries[child]["name"])
+                paths[child] = parent_path
+            return parent_path
+
+        for file_id, entry in entries.items():
+            entry_path = resolve(file_id)
+            if entry_path is None:
+                continue
+            entry["path"] = entry_path
+            entry["id"] = file_id
+            del entry["key"], entry["parent_key"]
+            yield entry
+
+    def _iter_files(self, query, fields):
+        """Yields the file resources matching a query, following nextPageToken."""
+        page_token = None
+        while True:
+            try:
+                results = self._execute(
+                    self.service.files().list(
+                        q=query,
+                        pageSize=MAX_PAGE_SIZE,
+                        pageToken=page_token,
+                        fields=f"nextPageToken, files({fields})",
+                    )
+                )
+            except HttpError as error:
+                raise FileSynchronizationError(
+                    f"Error listing Google Drive files: {error}"
+                )
+            yield from results.get("files", [])
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+
+    def _item_to_entry(self, item):
+        """Converts a Drive file resource into a listing dictionary."""
+        if item["mimeType"] == FOLDER_MIME_TYPE:
+            return {"name": item["name"], "type": "folder", "id": item["id"]}
+        entry = {"name": item["name"], "type": "file", "id": item["id"]}
+        if "size" in item:
+            entry["size"] = int(item["size"])
+        if "modifiedTime" in item:
+            modified_time = item["modifiedTime"].replace("Z", "+00:00")
+            modified = datetime.fromisoformat(modified_time)
+            entry["mtime_ns"] = int(modified.timestamp() * 1_000_000) * 1000
+        if "md5Checksum" in item:
+            entry["hash"] = item["md5Checksum"]
+        return entry
 
     def download_file(self, remote_path, local_path):
-        """Downloads a file from Google Drive to the local path."""
+        """Downloads a file from Google Drive to the local path.
+
+        The content is fetched in chunks straight into a temporary file that
+        replaces the local path only once the download is complete.
+        """
         file_id = self._get_file_id_by_path(remote_path)
         if file_id is None:
             raise FileSynchronizationError(f"File not found in Google Drive: {remote_path}")
 
         request = self.service.files().get_media(fileId=file_id)
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while done is False:
-            status, done = downloader.next_chunk()
-            print(f"Download {int(status.progress() * 100)}%.")
-
-        with open(local_path, "wb") as f:
-            f.write(fh.getvalue())
+        try:
+            with atomic_write(local_path, fsync=self.download_fsync) as f:
+                downloader = MediaIoBaseDownload(
+                    f, request, chunksize=self.download_chunk_size
+                )
+                done = False
+                while done is False:
+                    self.rate_limiter.throttle_bytes(self.download_chunk_size)
+                    status, done = self._next_chunk(downloader)
+        except HttpError as error:
+            raise FileSynchronizationError(
+                f"Error downloading file from Google Drive: {error}"
+            )
 
     def upload_file(self, local_path, remote_path):
-        """Uploads a file from the local path to Google Drive."""
+        """Uploads a file from the local path to Google Drive.
+
+        An existing file at the remote path is updated in place rather than
+        duplicated. Files larger than one upload chunk use a resumable upload
+        whose session URI is kept in the state directory, so an interrupted
+        transfer continues from the last acknowledged byte on the next try.
+        """
         folder_path, file_name = os.path.split(remote_path)
         folder_id = self._get_folder_id_by_path(folder_path)
 
         if folder_id is None:
             raise FileSynchronizationError(f"Destination folder not found in Google Drive: {folder_path}")
 
-        file_metadata = {"name": file_name, "parents": [folder_id]}
-        media = MediaFileUpload(local_path)
-
+        existing_id = self._get_file_id_by_path(remote_path)
         try:
-            file = self.service.files().create(body=file_metadata, media_body=media, fields="id").execute()
+            st = os.stat(local_path)
+            resumable = st.st_size > self.upload_chunk_size
+            media = MediaFileUpload(
+                local_path, chunksize=self.upload_chunk_size, resumable=resumable
+            )
+            if existing_id is not None:
+                request = self.service.files().update(
+                    fileId=existing_id, media_body=media, fields="id"
+                )
+            else:
+                file_metadata = {"name": file_name, "parents": [folder_id]}
+                request = self.service.files().create(
+                    body=file_metadata, media_body=media, fields="id"
+                )
+
+            session_key = f"{remote_path}|{local_path}|{st.st_size}|{st.st_mtime_ns}"
+            if resumable:
+                file = self._execute_resumable(request, session_key)
+            else:
+                self.rate_limiter.throttle_bytes(st.st_size)
+                file = self._execute(request)
+            self.id_cache.put(remote_path, file["id"])
             print(f"Uploaded file with ID: {file.get('id')}")
         except HttpError as error:
             print(f"An error occurred: {error}")
             raise FileSynchronizationError(f"Error uploading file to Google Drive: {error}")
+        except OSError as error:
+            # E.g. the local file vanished or became unreadable since planning
+            raise FileSynchronizationError(
+                f"Error uploading file to Google Drive: {local_path}: {error}"
+            )
+
+    def _execute_resumable(self, request, session_key):
+        """Runs a resumable upload request, resuming a saved session if any.
+
+        Args:
+            request: The files().create or files().update request.
+            session_key: Identifies the upload; it includes the size and mtime
+                of the local file so that a changed file starts over.
+
+        Returns:
+            The response body of the completed upload.
+        """
+        with _upload_sessions_lock:
+            saved_uri = self._load_upload_sessions().get(session_key)
+        resumed = saved_uri is not None and _resume_from_server(request, saved_uri)
+        if saved_uri is not None and not resumed:
+            self._save_upload_session(session_key, None)
+            saved_uri = None
+
+        try:
+            response = None
+            while response is None:
+                self.rate_limiter.throttle_bytes(self.upload_chunk_size)
+                _, response = self._next_chunk(request)
+                if saved_uri is None and request.resumable_uri is not None:
+                    saved_uri = request.resumable_uri
+                    self._save_upload_session(session_key, saved_uri)
+        except HttpError as error:
+            if error.resp.status in (404, 410) and resumed:
+                # The saved session expired; start a fresh one
+                self._save_upload_session(session_key, None)
+                _restart_upload(request)
+                return self._execute_resumable(request, session_key)
+            raise
+
+        self._save_upload_session(session_key, None)
+        return response
+
+    def _upload_sessions_path(self):
+        return os.path.join(self.config_manager.get_state_dir(), UPLOAD_SESSIONS_FILE)
+
+    def _load_upload_sessions(self):
+        """Returns the saved upload session URIs; the caller holds the lock."""
+        try:
+            with open(self._upload_sessions_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable upload sessions: {e}")
+            return {}
+
+    def _save_upload_session(self, session_key, uri):
+        """Stores (or, with uri=None, forgets) a resumable upload session URI."""
+        with _upload_sessions_lock:
+            sessions = self._load_upload_sessions()
+            if uri is None:
+                if session_key not in sessions:
+                    return
+                del sessions[session_key]
+            else:
+                sessions[session_key] = uri
+            with atomic_write(self._upload_sessions_path()) as f:
+                f.write(json.dumps(sessions, indent=2).encode("utf-8"))
 
     def delete_file(self, path):
         """Deletes a file or folder from Google Drive."""
@@ -148,11 +660,82 @@ class GoogleDriveConnector(FileSyncInterface):
             raise FileSynchronizationError(f"File or folder not found in Google Drive: {path}")
 
         try:
-            self.service.files().delete(fileId=file_id).execute()
+            self._execute(self.service.files().delete(fileId=file_id))
+            self.id_cache.invalidate(path)
         except HttpError as error:
             print(f"An error occurred: {error}")
             raise FileSynchronizationError(f"Error deleting from Google Drive: {error}")
 
+    def move_file(self, source_path, destination_path):
+        """Moves a file or folder by updating its name and parents."""
+        file_id, parent_id, new_parent_id = self._resolve_transfer(
+            source_path, destination_path
+        )
+        update = {"fileId": file_id, "fields": "id"}
+        if new_parent_id != parent_id:
+            update["addParents"] = new_parent_id
+            update["removeParents"] = parent_id
+
+        try:
+            self._execute(
+                self.service.files().update(
+                    body={"name": os.path.basename(destination_path)}, **update
+                )
+            )
+        except HttpError as error:
+            raise FileSynchronizationError(
+                f"Error moving in Google Drive: {source_path} -> "
+                f"{destination_path}: {error}"
+            )
+        self.id_cache.invalidate(source_path)
+        self.id_cache.put(destination_path, file_id)
+
+    def copy_file(self, source_path, destination_path):
+        """Copies a file server-side with files().copy."""
+        file_id, _, new_parent_id = self._resolve_transfer(
+            source_path, destination_path
+        )
+        body = {
+            "name": os.path.basename(destination_path),
+            "parents": [new_parent_id],
+        }
+
+        try:
+            file = self._execute(
+                self.service.files().copy(fileId=file_id, body=body, fields="id")
+            )
+        except HttpError as error:
+            raise FileSynchronizationError(
+                f"Error copying in Google Drive: {source_path} -> "
+                f"{destination_path}: {error}"
+            )
+        self.id_cache.put(destination_path, file["id"])
+
+    def _resolve_transfer(self, source_path, destination_path):
+        """Returns the IDs of a file, its parent and the destination's parent.
+
+        Raises:
+            FileSynchronizationError: If any of them does not exist.
+        """
+        file_id = self._get_file_id_by_path(source_path)
+        if file_id is None:
+            raise FileSynchronizationError(
+                f"File or folder not found in Google Drive: {source_path}"
+            )
+        parent_path = os.path.dirname(source_path)
+        new_parent_path = os.path.dirname(destination_path)
+        parent_id = self._get_folder_id_by_path(parent_path)
+        new_parent_id = (
+            parent_id
+            if new_parent_path == parent_path
+            else self._get_folder_id_by_path(new_parent_path)
+        )
+        if new_parent_id is None:
+            raise FileSynchronizationError(
+                f"Parent folder not found in Google Drive: {new_parent_path}"
+            )
+        return file_id, parent_id, new_parent_id
+
     def create_folder(self, path):
         """Creates a folder in Google Drive."""
         parent_path, folder_name = os.path.split(path)
@@ -163,17 +746,179 @@ class GoogleDriveConnector(FileSyncInterface):
 
         file_metadata = {
             "name": folder_name,
-            "mimeType": "application/vnd.google-apps.folder",
+            "mimeType": FOLDER_MIME_TYPE,
             "parents": [parent_id],
         }
 
         try:
-            file = self.service.files().create(body=file_metadata, fields="id").execute()
+            file = self._execute(
+                self.service.files().create(body=file_metadata, fields="id")
+            )
+            self.id_cache.put(path, file["id"])
             print(f"Created folder with ID: {file.get('id')}")
         except HttpError as error:
             print(f"An error occurred: {error}")
             raise FileSynchronizationError(f"Error creating folder in Google Drive: {error}")
 
+    def create_folders(self, paths):
+        """Creates several folders through the batch endpoint.
+
+        The parents must already exist. Up to MAX_BATCH_SIZE folders are
+        created per HTTP request.
+        """
+        requests = []
+        for path in paths:
+            parent_path, folder_name = os.path.split(path)
+            parent_id = self._get_folder_id_by_path(parent_path)
+            if parent_id is None:
+                raise FileSynchronizationError(f"Parent folder not found in Google Drive: {parent_path}")
+            file_metadata = {
+                "name": folder_name,
+                "mimeType": FOLDER_MIME_TYPE,
+                "parents": [parent_id],
+            }
+            requests.append(
+                (path, self.service.files().create(body=file_metadata, fields="id"))
+            )
+
+        for path, file in self._execute_batch(
+            requests, "Error creating folder in Google Drive"
+        ):
+            self.id_cache.put(path, file["id"])
+
+    def delete_files(self, paths):
+        """Deletes several files or folders through the batch endpoint.
+
+        IDs that are not cached yet are looked up in batches as well. Every
+        path that was found is deleted; the paths that were not found or
+        could not be deleted are reported together afterwards.
+        """
+        file_ids = self._get_file_ids_by_path(paths)
+        errors = [f"{path}: not found" for path in paths if file_ids.get(path) is None]
+        requests = [
+            (path, self.service.files().delete(fileId=file_ids[path]))
+            for path in paths
+            if file_ids.get(path) is not None
+        ]
+        deleted, failed = self._send_batch(requests, "Error deleting from Google Drive")
+        for path, _ in deleted:
+            self.id_cache.invalidate(path)
+        errors.extend(failed)
+        if errors:
+            raise FileSynchronizationError(
+                f"Error deleting from Google Drive: {'; '.join(errors)}"
+            )
+
+    def _get_file_ids_by_path(self, paths):
+        """Gets the file IDs of several paths, batching the uncached lookups.
+
+        Returns:
+            A dictionary of path -> file ID (or None if not found).
+        """
+        file_ids = {}
+        requests = []
+        for path in paths:
+            file_ids[path] = self.id_cache.get(path)
+            if file_ids[path] is not None:
+                continue
+            parent_folder, file_name = os.path.split(path)
+            folder_id = self._get_folder_id_by_path(parent_folder)
+            if folder_id is None:
+                continue
+            query = (
+                f"name = '{file_name}' and '{folder_id}' in parents and trashed = false"
+            )
+            request = self.service.files().list(q=query, pageSize=1, fields="files(id)")
+            requests.append((path, request))
+
+        found = self._execute_batch(requests, "Error looking up Google Drive files")
+        for path, results in found:
+            items = results.get("files", [])
+            if items:
+                file_ids[path] = items[0]["id"]
+                self.id_cache.put(path, items[0]["id"])
+        return file_ids
+
+    def _execute_batch(self, requests, message):
+        """Sends requests through the batch endpoint, MAX_BATCH_SIZE at a time.
+
+        Like _send_batch, but the failures are raised together once all
+        batches were sent.
+
+        Returns:
+            A list of (key, response) pairs for the requests that succeeded.
+
+        Raises:
+            FileSynchronizationError: If any request failed.
+        """
+        results, errors = self._send_batch(requests, message)
+        if errors:
+            raise FileSynchronizationError(f"{message}: {'; '.join(errors)}")
+        return results
+
+    def _send_batch(self, requests, message):
+        """Sends requests through the batch endpoint, MAX_BATCH_SIZE at a time.
+
+        Every request is attempted; failures are collected per item. Items
+        refused with a transient error (e.g. a rate limit) are sent again in
+        a later batch, after a backoff delay.
+
+        Args:
+            requests: A list of (key, request) pairs.
+            message: The prefix of the error raised if a whole batch fails.
+
+        Returns:
+            A tuple (results, errors): the (key, response) pairs of the
+            requests that succeeded, and a "<key>: <error>" message for each
+            request that failed.
+
+        Raises:
+            FileSynchronizationError: If a batch request as a whole failed.
+        """
+        results = []
+        errors = []
+        attempt = 1
+        while requests:
+            retries = []
+            retry_after = None
+            throttled = False
+            for start in range(0, len(requests), MAX_BATCH_SIZE):
+                chunk = requests[start : start + MAX_BATCH_SIZE]
+
+                def callback(request_id, response, exception, chunk=chunk):
+                    nonlocal retry_after, throttled
+                    key, request = chunk[int(request_id)]
+                    if exception is None:
+                        results.append((key, response))
+                        return
+                    retry = _classify_error(exception)
+                    if retry is None or attempt >= self.rate_limiter.max_attempts:
+                        errors.append(f"{key}: {exception}")
+                        return
+                    retries.append((key, request))
+                    throttled = throttled or retry[0]
+                    if retry[1] is not None:
+                        retry_after = max(retry_after or 0, retry[1])
+
+                batch = self.service.new_batch_http_request(callback=callback)
+                for index, (_, request) in enumerate(chunk):
+                    batch.add(request, request_id=str(index))
+                try:
+                    self._execute(batch)
+                except HttpError as error:
+                    raise FileSynchronizationError(f"{message}: {error}")
+
+            if retries:
+                print(
+                    f"Warning: {len(retries)} batched requests were refused; "
+                    f"retrying (attempt {attempt + 1} of "
+                    f"{self.rate_limiter.max_attempts})"
+                )
+                self.rate_limiter.backoff(attempt, retry_after, throttled)
+            requests = retries
+            attempt += 1
+        return results, errors
+
     def _get_file_id_by_path(self, path):
         """Gets the Google Drive file ID from a path.
 
@@ -183,6 +928,10 @@ class GoogleDriveConnector(FileSyncInterface):
         Returns:
             The file ID (str) or None if not found.
         """
+        cached_id = self.id_cache.get(path)
+        if cached_id is not None:
+            return cached_id
+
         parent_folder, file_name = os.path.split(path)
         folder_id = self._get_folder_id_by_path(parent_folder)
 
@@ -190,18 +939,68 @@ class GoogleDriveConnector(FileSyncInterface):
             return None  # Folder not found
 
         query = f"name = '{file_name}' and '{folder_id}' in parents and trashed = false"
-        results = (
-            self.service.files()
-            .list(
-                q=query,
-                pageSize=10,
-                fields="nextPageToken, files(id, name)",
-            )
-            .execute()
+        results = self._execute(
+            self.service.files().list(q=query, pageSize=1, fields="files(id)")
         )
         items = results.get("files", [])
 
         if not items:
             return None  # File not found
 
+        self.id_cache.put(path, items[0]["id"])
         return items[0]["id"]
+
+
+def _join_name(parent_path, name):
+    """Joins a name onto a "/"-separated relative path."""
+    return f"{parent_path}/{name}" if parent_path else name
+
+
+def _resume_from_server(request, resumable_uri):
+    """Points a resumable upload request at an existing upload session.
+
+    googleapiclient has no public way to resume a session: HttpRequest only
+    asks the server how many bytes it already has (instead of sending from
+    byte 0) when its private _in_error_state flag is set, as it is after a
+    failed chunk. This is the only place that relies on it.
+
+    Returns:
+        True if the request will resume the session. False if this version
+        of googleapiclient lacks the flag, in which case the request is left
+        untouched and the upload starts over in a new session.
+    """
+    if not hasattr(request, "_in_error_state"):
+        return False
+    request.resumable_uri = resumable_uri
+    request._in_error_state = True
+    return True
+
+
+def _restart_upload(request):
+    """Makes a resumable upload request start over in a new session."""
+    request.resumable_uri = None
+    request.resumable_progress = 0
+    if hasattr(request, "_in_error_state"):
+        request._in_error_state = False
+
+
+def _classify_error(error):
+    """Tells the rate limiter whether a Drive API error is worth retrying.
+
+    Returns:
+        None if the error is permanent, else a (throttled, retry_after) pair.
+    """
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        retry_after = parse_retry_after(error.resp.get("retry-after"))
+        if status == 403:
+            content = error.content.decode("utf-8", "replace")
+            if any(reason in content for reason in RATE_LIMIT_REASONS):
+                return True, retry_after
+            return None
+        if status in RETRYABLE_STATUS_CODES:
+            return status == 429, retry_after
+        return None
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return False, None
+    return None
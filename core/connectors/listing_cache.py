@@ -0,0 +1,231 @@
+import os
+import sqlite3
+import threading
+
+_ENTRY_COLUMNS = (
+    "key",
+    "parent_key",
+    "name",
+    "path",
+    "type",
+    "size",
+    "mtime_ns",
+    "hash",
+)
+
+
+# Database path -> the ListingCache shared by every connector using it
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class ListingCache:
+    """Local snapshot of remote trees, kept current with change cursors.
+
+    Remote services that offer incremental change feeds (Dropbox list_folder
+    cursors, Google Drive change tokens) let a connector fetch only what
+    changed since the previous run. This cache stores, per listed root, the
+    last cursor plus the entries it describes, so that a full tree listing
+    can be served locally once the deltas have been applied.
+
+    Each entry is identified by a connector-defined ``key`` (e.g. a
+    lower-cased path or a file ID). Connectors that address entries by ID can
+    store ``parent_key`` and ``name`` and resolve paths themselves; the others
+    store ``path`` directly.
+
+    Changes are made through a ListingUpdate (see begin()), which collects
+    them in memory while the remote side is paged and writes them in one
+    short transaction. Connectors of concurrently running tasks share one
+    instance per file (see open()), so they never contend for the database
+    lock.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cursors (root TEXT PRIMARY KEY, cursor TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "root TEXT, key TEXT, parent_key TEXT, name TEXT, path TEXT, type TEXT, "
+            "size INTEGER, mtime_ns INTEGER, hash TEXT, PRIMARY KEY (root, key))"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def open(cls, state_dir, name):
+        """Returns the cache stored in ``<name>.sqlite`` in a state directory.
+
+        The file is opened (or created) once per process; later calls return
+        the same instance.
+        """
+        db_path = os.path.abspath(os.path.join(state_dir, f"{name}.sqlite"))
+        with _caches_lock:
+            cache = _caches.get(db_path)
+            if cache is None:
+                cache = cls(db_path)
+                _caches[db_path] = cache
+            return cache
+
+    def begin(self, root):
+        """Starts collecting changes to a root; see ListingUpdate."""
+        return ListingUpdate(self, root)
+
+    def get_cursor(self, root):
+        """Returns the stored cursor for a root, or None if it was never listed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cursor FROM cursors WHERE root = ?", (root,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get(self, root, key):
+        """Returns a single entry (with "key" and "parent_key") or None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_ENTRY_COLUMNS)} FROM entries "
+                "WHERE root = ? AND key = ?",
+                (root, key),
+            ).fetchone()
+        return _row_to_entry(row) if row else None
+
+    def iter_entries(self, root):
+        """Yields every cached entry of a root (with "key" and "parent_key")."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_ENTRY_COLUMNS)} FROM entries WHERE root = ?",
+                (root,),
+            ).fetchall()
+        for row in rows:
+            yield _row_to_entry(row)
+
+    def _apply(self, update, cursor):
+        """Writes the changes of an update and its cursor in one transaction."""
+        root = update.root
+        with self._lock:
+            try:
+                if update.is_reset:
+                    self._conn.execute("DELETE FROM entries WHERE root = ?", (root,))
+                self._conn.executemany(
+                    "DELETE FROM entries WHERE root = ? AND key = ?",
+                    [(root, key) for key in update.deleted],
+                )
+                self._conn.executemany(
+                    "DELETE FROM entries WHERE root = ? AND substr(key, 1, ?) = ?",
+                    [(root, len(prefix), prefix) for prefix in update.deleted_prefixes],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        _entry_to_row(root, key, entry, parent_key)
+                        for key, (entry, parent_key) in update.upserted.items()
+                    ],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cursors VALUES (?, ?)", (root, cursor)
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ListingUpdate:
+    """Changes to one root of a ListingCache, written together on commit().
+
+    Nothing touches the database until commit(), so a refresh that fails
+    halfway simply drops its update. Reads through get() see the pending
+    changes on top of the stored entries.
+    """
+
+    def __init__(self, cache, root):
+        self.cache = cache
+        self.root = root
+        self.is_reset = False
+        self.upserted = {}  # key -> (entry, parent_key)
+        self.deleted = set()
+        self.deleted_prefixes = []
+
+    def reset(self):
+        """Forgets all entries of the root, stored and pending."""
+        self.is_reset = True
+        self.upserted.clear()
+        self.deleted.clear()
+        self.deleted_prefixes.clear()
+
+    def upsert(self, key, entry, parent_key=None):
+        """Inserts or replaces one entry.
+
+        Args:
+            key: The connector-defined identity of the entry.
+            entry: A listing dictionary ("name", "type" and optional metadata,
+                plus "path" for path-addressed connectors).
+            parent_key: The key of the parent entry, for ID-addressed
+                connectors.
+        """
+        self.upserted[key] = (dict(entry), parent_key)
+        self.deleted.discard(key)
+
+    def delete(self, key, descendants_prefix=None):
+        """Removes an entry and, optionally, every key below a prefix.
+
+        Args:
+            key: The key of the entry to remove.
+            descendants_prefix: If given, entries whose key starts with this
+                prefix are removed as well (used for path-keyed folders).
+        """
+        self.upserted.pop(key, None)
+        if not self.is_reset:
+            self.deleted.add(key)
+        if descendants_prefix:
+            for pending_key in [
+                k for k in self.upserted if k.startswith(descendants_prefix)
+            ]:
+                del self.upserted[pending_key]
+            if not self.is_reset:
+                self.deleted_prefixes.append(descendants_prefix)
+
+    def get(self, key):
+        """Returns an entry (with "key" and "parent_key") or None."""
+        if key in self.upserted:
+            entry, parent_key = self.upserted[key]
+            entry = dict(entry, key=key)
+            if parent_key is not None:
+                entry["parent_key"] = parent_key
+            return entry
+        if self.is_reset or key in self.deleted:
+            return None
+        if any(key.startswith(prefix) for prefix in self.deleted_prefixes):
+            return None
+        return self.cache.get(self.root, key)
+
+    def commit(self, cursor):
+        """Writes the changes, and the cursor they lead to, in one transaction."""
+        self.cache._apply(self, cursor)
+
+
+def _entry_to_row(root, key, entry, parent_key):
+    return (
+        root,
+        key,
+        parent_key,
+        entry.get("name"),
+        entry.get("path"),
+        entry.get("type"),
+        entry.get("size"),
+        entry.get("mtime_ns"),
+        entry.get("hash"),
+    )
+
+
+def _row_to_entry(row):
+    entry = dict(zip(_ENTRY_COLUMNS, row))
+    return {key: value for key, value in entry.items() if value is not None}
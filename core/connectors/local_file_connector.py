@@ -1,30 +1,130 @@
 import os
 import shutil
+import stat
+from core.connectors.delta_copy import (
+    DEFAULT_DELTA_BLOCK_SIZE,
+    DEFAULT_DELTA_THRESHOLD,
+    delta_copy,
+    should_delta_copy,
+)
 from core.connectors.file_sync_interface import (
     FileSyncInterface,
     FileSynchronizationError,
+    PathNotFoundError,
 )
+from core.connectors.fast_copy import copy_file
+
+
+def _entry_type(entry):
+    """Returns "folder" or "file" for a DirEntry, following symlinks."""
+    try:
+        return "folder" if entry.is_dir() else "file"
+    except OSError:
+        return "file"
+
+
+def _entry_to_dict(entry):
+    """Converts a DirEntry into a listing dictionary with stat metadata."""
+    try:
+        st = entry.stat()
+    except OSError:
+        # Dangling symlink or a file that vanished mid-listing
+        return {"name": entry.name, "type": _entry_type(entry)}
+    return {
+        "name": entry.name,
+        "type": "folder" if stat.S_ISDIR(st.st_mode) else "file",
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "inode": st.st_ino,
+        "mode": st.st_mode,
+    }
 
 
 class LocalFileConnector(FileSyncInterface):
     """Implementation of FileSyncInterface for local file system."""
 
+    max_concurrency = 16
+    supports_move = True
+
+    def __init__(self):
+        self.configure({})
+
+    def configure(self, options):
+        """Reads the delta transfer options of a task.
+
+        Understood keys are "delta_transfer" (default True), "delta_threshold"
+        and "delta_block_size". Files at least delta_threshold bytes large
+        that already exist in the destination are updated with delta_copy.
+        """
+        if options.get("delta_transfer", True):
+            self.delta_threshold = options.get(
+                "delta_threshold", DEFAULT_DELTA_THRESHOLD
+            )
+        else:
+            self.delta_threshold = None
+        self.delta_block_size = options.get(
+            "delta_block_size", DEFAULT_DELTA_BLOCK_SIZE
+        )
+
     def get_file_list(self, path):
         """Returns a list of files and folders at the given path."""
         try:
-            entries = []
-            for entry in os.listdir(path):
-                full_path = os.path.join(path, entry)
-                entry_type = "folder" if os.path.isdir(full_path) else "file"
-                entries.append({"name": entry, "type": entry_type})
-            return entries
-        except (FileNotFoundError, PermissionError, OSError) as e:
+            with os.scandir(path) as it:
+                return [
+                    {"name": entry.name, "type": _entry_type(entry)} for entry in it
+                ]
+        except FileNotFoundError as e:
+            raise PathNotFoundError(f"Error listing path '{path}': {e}")
+        except (PermissionError, OSError) as e:
             raise FileSynchronizationError(f"Error listing path '{path}': {e}")
 
+    def get_file_entries(self, path):
+        """Returns the entries at the given path with their stat metadata.
+
+        Everything comes from a single os.scandir pass; DirEntry caches its
+        stat result, so each entry costs at most one stat call.
+        """
+        try:
+            with os.scandir(path) as it:
+                return [_entry_to_dict(entry) for entry in it]
+        except FileNotFoundError as e:
+            raise PathNotFoundError(f"Error listing path '{path}': {e}")
+        except (PermissionError, OSError) as e:
+            raise FileSynchronizationError(f"Error listing path '{path}': {e}")
+
+    def list_tree(self, path):
+        """Yields every file and folder below the given path.
+
+        Walks the tree with os.scandir, so each entry costs one stat call.
+        """
+        pending = [""]
+        while pending:
+            relative_path = pending.pop()
+            folder_path = os.path.join(path, relative_path) if relative_path else path
+            prefix = f"{relative_path}/" if relative_path else ""
+            try:
+                with os.scandir(folder_path) as it:
+                    entries = [_entry_to_dict(entry) for entry in it]
+            except FileNotFoundError as e:
+                if not relative_path:
+                    raise PathNotFoundError(f"Error listing path '{path}': {e}")
+                raise FileSynchronizationError(
+                    f"Error listing path '{folder_path}': {e}"
+                )
+            except (PermissionError, OSError) as e:
+                raise FileSynchronizationError(
+                    f"Error listing path '{folder_path}': {e}"
+                )
+            for entry in entries:
+                entry["path"] = prefix + entry["name"]
+                yield entry
+                if entry["type"] == "folder":
+                    pending.append(entry["path"])
+
     def download_file(self, remote_path, local_path):
         """Downloads a file (in this case, copies it)."""
         try:
-            shutil.copy2(remote_path, local_path)
+            self._copy_file(remote_path, local_path)
         except (FileNotFoundError, PermissionError, IsADirectoryError, OSError) as e:
             raise FileSynchronizationError(
                 f"Error downloading from '{remote_path}' to '{local_path}': {e}"
@@ -33,12 +133,43 @@ class LocalFileConnector(FileSyncInterface):
     def upload_file(self, local_path, remote_path):
         """Uploads a file (in this case, copies it)."""
         try:
-            shutil.copy2(local_path, remote_path)
+            self._copy_file(local_path, remote_path)
         except (FileNotFoundError, PermissionError, IsADirectoryError, OSError) as e:
             raise FileSynchronizationError(
                 f"Error uploading from '{local_path}' to '{remote_path}': {e}"
             )
 
+    def _copy_file(self, source_path, destination_path):
+        """Copies a file and its metadata.
+
+        Large files that already exist in the destination only get their
+        changed blocks rewritten (see delta_copy); everything else goes
+        through copy_file, which uses reflinks or in-kernel copies.
+        """
+        if should_delta_copy(source_path, destination_path, self.delta_threshold):
+            delta_copy(source_path, destination_path, self.delta_block_size)
+        else:
+            copy_file(source_path, destination_path)
+            shutil.copystat(source_path, destination_path)
+
+    def move_file(self, source_path, destination_path):
+        """Moves (renames) a file or folder."""
+        try:
+            os.rename(source_path, destination_path)
+        except OSError as e:
+            raise FileSynchronizationError(
+                f"Error moving '{source_path}' to '{destination_path}': {e}"
+            )
+
+    def copy_file(self, source_path, destination_path):
+        """Copies a file."""
+        try:
+            self._copy_file(source_path, destination_path)
+        except OSError as e:
+            raise FileSynchronizationError(
+                f"Error copying '{source_path}' to '{destination_path}': {e}"
+            )
+
     def delete_file(self, path):
         """Deletes a file."""
         try:
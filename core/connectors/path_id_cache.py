@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PathIdCache:
+    """Bounded cache of remote path -> file ID lookups.
+
+    Services such as Google Drive address files by ID, so every path has to
+    be resolved one component at a time. This cache remembers resolved paths
+    in LRU order, tracks parent -> children so that removing a folder also
+    forgets everything below it, and can expire entries after a TTL for trees
+    that other writers modify too.
+
+    Paths are "/"-separated; leading and trailing slashes are ignored.
+    """
+
+    def __init__(self, max_entries=100000, ttl=None):
+        """Initializes the cache.
+
+        Args:
+            max_entries: The maximum number of paths to remember.
+            ttl: Seconds after which an entry is considered stale, or None to
+                keep entries until they are evicted or invalidated.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """Returns the cached ID of a path, or None if unknown or expired."""
+        key = _normalize(path)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            file_id, stored_at = cached
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return file_id
+
+    def put(self, path, file_id):
+        """Remembers the ID of a path."""
+        key = _normalize(path)
+        with self._lock:
+            self._entries[key] = (file_id, time.monotonic())
+            self._entries.move_to_end(key)
+            parent, _, name = key.rpartition("/")
+            self._children.setdefault(parent, set()).add(name)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate(self, path):
+        """Forgets a path and every path below it."""
+        with self._lock:
+            self._remove(_normalize(path))
+
+    def clear(self):
+        """Forgets everything."""
+        with self._lock:
+            self._entries.clear()
+            self._children.clear()
+
+    def _remove(self, key):
+        pending = [key]
+        while pending:
+            current = pending.pop()
+            self._entries.pop(current, None)
+            for name in self._children.pop(current, ()):
+                pending.append(f"{current}/{name}" if current else name)
+            parent, _, name = current.rpartition("/")
+            siblings = self._children.get(parent)
+            if siblings is not None:
+                siblings.discard(name)
+                if not siblings:
+                    del self._children[parent]
+
+
+def _normalize(path):
+    return path.strip("/")
@@ -0,0 +1,284 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+DEFAULT_MAX_ATTEMPTS = 6
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 60
+# Consecutive successful calls after which one more call may be in flight
+DEFAULT_RECOVERY_CALLS = 20
+# Responses worth retrying; 429 also means the service is throttling us
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Service name -> RateLimiter shared by every connector of that service
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class TokenBucket:
+    """A thread-safe token bucket.
+
+    Tokens accumulate at ``rate`` per second up to ``capacity``. A request
+    for more tokens than the capacity waits for a full bucket and leaves it
+    in debt, so large requests are paced rather than refused.
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Blocks until the tokens are available and takes them."""
+        needed = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """Caps the number of calls in flight and adapts the cap to throttling.
+
+    The cap starts at ``max_limit``. A throttled call halves it (down to 1),
+    and every ``recovery_calls`` consecutive successes raise it by one again,
+    so concurrency settles just below what the service accepts. Calls that
+    were already in flight when the cap was lowered do not lower it again:
+    one burst of 429 responses counts as a single congestion signal.
+    """
+
+    def __init__(self, max_limit, recovery_calls=DEFAULT_RECOVERY_CALLS):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.recovery_calls = recovery_calls
+        self._active = 0
+        self._successes = 0
+        self._lowered_at = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Waits for a free slot.
+
+        Returns:
+            The start time of the call, to be passed to release().
+        """
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+            return time.monotonic()
+
+    def release(self, started, throttled=False):
+        """Frees the slot of a call that started at ``started``."""
+        with self._condition:
+            self._active -= 1
+            if throttled:
+                self._successes = 0
+                if started >= self._lowered_at:
+                    self.limit = max(1, self.limit // 2)
+                    self._lowered_at = time.monotonic()
+            elif self.limit < self.max_limit:
+                self._successes += 1
+                if self._successes >= self.recovery_calls:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+class RateLimiter:
+    """Paces, caps and retries the API calls made to one service.
+
+    Every call takes a token from the request bucket (if a request rate is
+    set) and a slot from the adaptive concurrency cap. Failures that the
+    caller classifies as transient are retried with exponential backoff and
+    full jitter; a delay requested by the service (Retry-After) is honored
+    instead. When the service throttles, every caller sharing the limiter
+    holds back for that delay, not only the one that was refused.
+    Transfers can additionally be capped in bytes per second with
+    throttle_bytes().
+    """
+
+    def __init__(
+        self,
+        requests_per_second=None,
+        bytes_per_second=None,
+        max_concurrency=1,
+        max_attempts=DEFAULT_MAX_ATTEMPTS,
+        base_delay=DEFAULT_BASE_DELAY,
+        max_delay=DEFAULT_MAX_DELAY,
+    ):
+        """Initializes the limiter.
+
+        Args:
+            requests_per_second: The sustained request rate, or None for no
+                limit.
+            bytes_per_second: The transfer bandwidth cap, or None for no cap.
+            max_concurrency: The highest number of calls in flight.
+            max_attempts: The number of attempts per call, retries included.
+            base_delay: The backoff delay before the first retry, in seconds.
+            max_delay: The upper bound of the backoff delay, in seconds.
+        """
+        self.requests = (
+            TokenBucket(requests_per_second) if requests_per_second else None
+        )
+        self.bandwidth = TokenBucket(bytes_per_second) if bytes_per_second else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def call(self, function, classify, *args, **kwargs):
+        """Calls a function, retrying transient failures.
+
+        Args:
+            function: The API call.
+            classify: Called with an exception raised by the function. Returns
+                None if it is not worth retrying, or a (throttled, retry_after)
+                pair: throttled is True if the service refused the call for
+                rate reasons, and retry_after the delay it asked for, in
+                seconds, or None.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            The return value of the function.
+
+        Raises:
+            Exception: The last error, once it is not retryable or the
+                attempts are exhausted.
+        """
+        attempt = 0
+        while True:
+            self._wait_until_resumed()
+            if self.requests is not None:
+                self.requests.acquire()
+            started = self.concurrency.acquire()
+            throttled = False
+            try:
+                return function(*args, **kwargs)
+            except Exception as e:
+                retry = classify(e)
+                attempt += 1
+                if retry is None or attempt >= self.max_attempts:
+                    raise
+                throttled, retry_after = retry
+                print(
+                    f"Warning: {type(e).__name__}: {e}; retrying "
+                    f"(attempt {attempt + 1} of {self.max_attempts})"
+                )
+            finally:
+                self.concurrency.release(started, throttled)
+            self.backoff(attempt, retry_after, throttled)
+
+    def backoff(self, attempt, retry_after=None, throttled=False):
+        """Sleeps before retry number ``attempt`` (1 for the first).
+
+        Args:
+            attempt: The number of attempts made so far.
+            retry_after: The delay requested by the service, in seconds, or
+                None.
+            throttled: True if the service is throttling; every caller
+                sharing the limiter then holds back for the delay.
+        """
+        delay = self.backoff_delay(attempt, retry_after)
+        if throttled:
+            self._pause(delay)
+        time.sleep(delay)
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Returns the delay before retry number ``attempt`` (1 for the first).
+
+        A Retry-After delay is used as is, plus a little jitter so that the
+        callers it stopped do not all come back at the same instant.
+        """
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.base_delay)
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def throttle_bytes(self, count):
+        """Waits until ``count`` bytes may be transferred under the bandwidth cap."""
+        if self.bandwidth is not None and count > 0:
+            self.bandwidth.acquire(count)
+
+    def _pause(self, delay):
+        """Holds back every call through this limiter for ``delay`` seconds."""
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    def _wait_until_resumed(self):
+        while True:
+            with self._lock:
+                remaining = self._resume_at - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+
+def get_rate_limiter(config_manager, service, max_concurrency):
+    """Returns the rate limiter shared by every connector of a service.
+
+    The limiter is created on first use from the configuration keys
+    "<service>_requests_per_second", "<service>_bandwidth_limit" (bytes per
+    second) and "api_max_attempts"; unset keys mean no limit and the default
+    number of attempts.
+
+    Args:
+        config_manager: The ConfigurationManager to read the settings from.
+        service: The service name, e.g. "dropbox".
+        max_concurrency: The connector's max_concurrency.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(service)
+        if limiter is None:
+            limiter = RateLimiter(
+                requests_per_second=config_manager.get_config(
+                    f"{service}_requests_per_second"
+                ),
+                bytes_per_second=config_manager.get_config(
+                    f"{service}_bandwidth_limit"
+                ),
+                max_concurrency=max_concurrency,
+                max_attempts=config_manager.get_config(
+                    "api_max_attempts", DEFAULT_MAX_ATTEMPTS
+                ),
+            )
+            _limiters[service] = limiter
+        return limiter
+
+
+def parse_retry_after(value):
+    """Parses a Retry-After header (seconds or an HTTP date) into seconds.
+
+    Returns:
+        The delay in seconds, or None if the value is missing or invalid.
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
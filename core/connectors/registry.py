@@ -0,0 +1,85 @@
+import importlib
+import threading
+
+# Entry point group through which installed packages provide connectors:
+#
+#     [project.entry-points."syncary.connectors"]
+#     s3 = "syncary_s3.connector:S3Connector"
+ENTRY_POINT_GROUP = "syncary.connectors"
+# The scheme of destinations given as plain paths
+DEFAULT_SCHEME = "file"
+
+# Scheme -> connector class, or a "module:attribute" reference to it until
+# first use, so that cloud SDKs are only imported by the tasks that need them
+_connectors = {
+    "file": "core.connectors.local_file_connector:LocalFileConnector",
+    "dropbox": "core.connectors.dropbox_connector:DropboxConnector",
+    "googledrive": "core.connectors.google_drive_connector:GoogleDriveConnector",
+}
+_entry_points_loaded = False
+_lock = threading.Lock()
+
+
+def register_connector(scheme, connector):
+    """Registers the connector of a URI scheme, replacing any previous one.
+
+    Args:
+        scheme: The scheme, without "://" (e.g. "dropbox").
+        connector: A FileSyncInterface subclass, or a "module:attribute"
+            reference to one, which is imported when first needed.
+    """
+    with _lock:
+        _connectors[scheme] = connector
+
+
+def uri_scheme(uri):
+    """Returns the scheme of a "scheme://path" URI, or "file" for a plain path."""
+    scheme, separator, _ = uri.partition("://")
+    return scheme if separator else DEFAULT_SCHEME
+
+
+def get_connector_class(scheme):
+    """Returns the connector class of a URI scheme, importing it on first use.
+
+    Schemes registered in code take precedence; installed entry points of
+    the "syncary.connectors" group are only looked at for other schemes.
+
+    Raises:
+        ValueError: If no connector is registered for the scheme.
+    """
+    global _entry_points_loaded
+    with _lock:
+        connector = _connectors.get(scheme)
+        if connector is None and not _entry_points_loaded:
+            for name, reference in _iter_entry_points():
+                _connectors.setdefault(name, reference)
+            _entry_points_loaded = True
+            connector = _connectors.get(scheme)
+        if connector is None:
+            raise ValueError(f"No connector registered for scheme '{scheme}://'")
+        if isinstance(connector, str):
+            connector = _import_reference(connector)
+            _connectors[scheme] = connector
+        return connector
+
+
+def _iter_entry_points():
+    """Yields (scheme, "module:attribute") for the installed connector plugins."""
+    # Imported here: it is slow to import and only needed for unknown schemes
+    from importlib import metadata
+
+    try:
+        entry_points = metadata.entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # Python < 3.10
+        entry_points = metadata.entry_points().get(ENTRY_POINT_GROUP, [])
+    for entry_point in entry_points:
+        yield entry_point.name, entry_point.value
+
+
+def _import_reference(reference):
+    """Imports the object named by a "module:attribute" reference."""
+    module_name, _, attribute = reference.partition(":")
+    value = importlib.import_module(module_name)
+    for name in filter(None, attribute.split(".")):
+        value = getattr(value, name)
+    return value
@@ -0,0 +1,37 @@
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+# Account (or connector) -> {worker count: ThreadPoolExecutor}. Pools live as
+# long as their owner; once it is garbage collected, so is the pool, and its
+# idle threads exit.
+_pools = weakref.WeakKeyDictionary()
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(connector, max_workers):
+    """Returns the thread pool that runs a connector's blocking calls.
+
+    Pools are kept alive across runs and shared by the connectors of one
+    account (the connector's ``account`` attribute, or the connector itself
+    if it has none), so their threads, and whatever the account keeps per
+    thread (e.g. GoogleDriveAccount's Drive services and their connections),
+    are reused instead of being rebuilt by every run.
+
+    Args:
+        connector: The connector whose calls the pool runs.
+        max_workers: The number of worker threads.
+    """
+    owner = getattr(connector, "account", None) or connector
+    with _pools_lock:
+        pools = _pools.get(owner)
+        if pools is None:
+            pools = {}
+            _pools[owner] = pools
+        pool = pools.get(max_workers)
+        if pool is None:
+            pool = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="syncary-worker"
+            )
+            pools[max_workers] = pool
+        return pool
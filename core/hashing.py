@@ -0,0 +1,279 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import xxhash
+except ImportError:  # Optional accelerator for the "fast" algorithm
+    xxhash = None
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_CACHE_ENTRIES = 65536
+# Below this many bytes, starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+# Shards per process, so that uneven shards still keep every process busy
+SHARDS_PER_PROCESS = 4
+
+
+class DropboxContentHasher:
+    """hashlib-compatible implementation of Dropbox's content_hash.
+
+    The file is split into 4 MiB blocks, each block is hashed with SHA-256,
+    and the concatenated block digests are hashed with SHA-256 again. See
+    https://www.dropbox.com/developers/reference/content-hash
+    """
+
+    BLOCK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self):
+        self._overall = hashlib.sha256()
+        self._block = hashlib.sha256()
+        self._block_used = 0
+
+    def update(self, data):
+        view = memoryview(data)
+        while view:
+            take = min(len(view), self.BLOCK_SIZE - self._block_used)
+            self._block.update(view[:take])
+            self._block_used += take
+            view = view[take:]
+            if self._block_used == self.BLOCK_SIZE:
+                self._overall.update(self._block.digest())
+                self._block = hashlib.sha256()
+                self._block_used = 0
+
+    def hexdigest(self):
+        overall = self._overall.copy()
+        if self._block_used:
+            overall.update(self._block.digest())
+        return overall.hexdigest()
+
+
+# The implementation behind "fast": xxh3_128 (non-cryptographic, only
+# suitable for change detection) when xxhash is installed, else BLAKE2b,
+# the quickest of the cryptographic hashlib algorithms on 64-bit machines
+if xxhash is not None:
+    FAST_BACKEND, _fast_factory = "xxh3_128", xxhash.xxh3_128
+else:
+    FAST_BACKEND, _fast_factory = "blake2b", hashlib.blake2b
+
+ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+    "fast": _fast_factory,
+    # Match the fingerprints reported by remote services
+    "md5": hashlib.md5,
+    "dropbox": DropboxContentHasher,
+}
+
+# Algorithm -> the tag its digests carry, where it differs from its name
+DIGEST_TAGS = {"fast": FAST_BACKEND}
+
+
+class HashEngine:
+    """Content hashing with large buffered reads and an in-process LRU cache.
+
+    Files are read with ``readinto`` into a single preallocated buffer, so the
+    per-chunk cost is one syscall and one hasher update instead of a fresh
+    ``bytes`` object. Results are cached by (device, inode, size, mtime_ns),
+    which means a file that has not changed is never read twice per process.
+
+    Digests are returned as ``"<tag>:<hexdigest>"`` so that values produced
+    by different algorithms can be told apart. The tag is the algorithm name,
+    except for "fast", whose digests are tagged with the implementation that
+    produced them (see FAST_BACKEND).
+    """
+
+    def __init__(
+        self,
+        algorithm="sha256",
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        cache_entries=DEFAULT_CACHE_ENTRIES,
+    ):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(
+                f"Unknown hash algorithm '{algorithm}', expected one of: "
+                f"{', '.join(sorted(ALGORITHMS))}"
+            )
+        self.algorithm = algorithm
+        self.tag = DIGEST_TAGS.get(algorithm, algorithm)
+        self.chunk_size = chunk_size
+        self.cache_entries = cache_entries
+        self._factory = ALGORITHMS[algorithm]
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def owns(self, digest):
+        """Returns True if the digest was produced with this engine's algorithm."""
+        return digest is not None and digest.startswith(self.tag + ":")
+
+    def hash_file(self, file_path):
+        """Returns the digest of a file, using the cache when possible.
+
+        Args:
+            file_path: The path to the file.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        st = os.stat(file_path)
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._cache.get(key)
+            if digest is not None:
+                self._cache.move_to_end(key)
+                return digest
+
+        digest = f"{self.tag}:{self._read_and_hash(file_path)}"
+
+        with self._lock:
+            self._cache[key] = digest
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return digest
+
+    def hash_files(self, file_paths, processes):
+        """Hashes many files on a process pool.
+
+        Hashing is CPU-bound and a single process hashes on one core, so the
+        paths are sorted (keeping each subtree together for disk locality),
+        cut into contiguous shards of roughly equal byte size and hashed by
+        worker processes. The digests are returned, and also added to this
+        engine's cache; since a large job can overflow the cache, callers
+        should use the returned digests rather than rely on hash_file
+        finding them there.
+
+        Files that cannot be read are skipped; hash_file reports the errors
+        when it is called for them. Jobs too small to be worth the worker
+        processes are not hashed at all.
+
+        Args:
+            file_paths: The paths of the files to hash.
+            processes: The number of worker processes.
+
+        Returns:
+            A dictionary mapping file paths to their digests, including the
+            files that were already cached.
+        """
+        digests = {}
+        pending = []
+        total_size = 0
+        for file_path in sorted(set(file_paths)):
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            with self._lock:
+                digest = self._cache.get(
+                    (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+                )
+            if digest is not None:
+                digests[file_path] = digest
+                continue
+            pending.append((file_path, st.st_size))
+            total_size += st.st_size
+        if processes <= 1 or len(pending) < 2 or total_size < PARALLEL_MIN_BYTES:
+            return digests
+
+        shards = _shard_by_size(pending, processes * SHARDS_PER_PROCESS)
+        with ProcessPoolExecutor(
+            max_workers=processes, mp_context=_process_context()
+        ) as pool:
+            jobs = [(self.algorithm, self.chunk_size, shard) for shard in shards]
+            for results in pool.map(_hash_shard, jobs):
+                with self._lock:
+                    for file_path, key, digest in results:
+                        digests[file_path] = digest
+                        self._cache[key] = digest
+                    while len(self._cache) > self.cache_entries:
+                        self._cache.popitem(last=False)
+        return digests
+
+    def clear_cache(self):
+        """Drops all cached digests."""
+        with self._lock:
+            self._cache.clear()
+
+    def _buffer(self):
+        """Returns this thread's reusable read buffer."""
+        view = getattr(self._local, "view", None)
+        if view is None or len(view) != self.chunk_size:
+            view = memoryview(bytearray(self.chunk_size))
+            self._local.view = view
+        return view
+
+    def _read_and_hash(self, file_path):
+        hasher = self._factory()
+        view = self._buffer()
+        with open(file_path, "rb", buffering=0) as f:
+            while True:
+                count = f.readinto(view)
+                if not count:
+                    break
+                hasher.update(view[:count])
+        return hasher.hexdigest()
+
+
+def _shard_by_size(files, shard_count):
+    """Cuts a list of (path, size) pairs into contiguous shards of similar size."""
+    target = sum(size for _, size in files) / shard_count
+    shards = []
+    current = []
+    current_size = 0
+    for file_path, size in files:
+        current.append(file_path)
+        current_size += size
+        if current_size >= target:
+            shards.append(current)
+            current = []
+            current_size = 0
+    if current:
+        shards.append(current)
+    return shards
+
+
+def _process_context():
+    """Returns the multiprocessing context the hashing workers are started with.
+
+    Hashing runs while transfer and watcher threads are active, and a forked
+    child inherits their locks in whatever state they were in. Workers are
+    therefore started from a clean forkserver process, or spawned where
+    forkserver is not available.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _hash_shard(job):
+    """Worker process entry point: returns (path, cache key, digest) triples."""
+    algorithm, chunk_size, file_paths = job
+    engine = HashEngine(algorithm, chunk_size=chunk_size)
+    results = []
+    for file_path in file_paths:
+        try:
+            st = os.stat(file_path)
+            digest = f"{engine.tag}:{engine._read_and_hash(file_path)}"
+        except OSError:
+            continue
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        results.append((file_path, key, digest))
+    return results
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_hash_engine(algorithm="sha256"):
+    """Returns the process-wide engine for an algorithm, sharing its cache."""
+    with _engines_lock:
+        engine = _engines.get(algorithm)
+        if engine is None:
+            engine = HashEngine(algorithm)
+            _engines[algorithm] = engine
+        return engine
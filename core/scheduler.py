@@ -1,40 +1,195 @@
-import schedule
+import heapq
+import itertools
+import random
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from core.task_manager import TaskManager
+from core.watcher import DEFAULT_DEBOUNCE, InotifyWatcher
+
+DEFAULT_MAX_WORKERS = 4
+# Default start jitter, as a fraction of the interval and as an upper bound
+DEFAULT_JITTER_RATIO = 0.1
+MAX_DEFAULT_JITTER = 60
+
+
+class _Job:
+    """A scheduled task and its timing state."""
+
+    def __init__(self, task, interval=None, at_time=None, jitter=0):
+        self.task = task
+        self.interval = interval
+        self.at_time = at_time
+        self.jitter = jitter
+        self.running = False
+
+    def first_run(self, now):
+        """Returns the monotonic time of the first run."""
+        if self.at_time is not None:
+            due = now + _seconds_until(self.at_time)
+        else:
+            due = now + self.interval
+        return due + random.uniform(0, self.jitter)
+
+    def next_run(self, due, now):
+        """Returns the first run time after ``now`` following a run due at ``due``.
+
+        Runs that were missed (the process was suspended, or every worker was
+        busy) are coalesced into the one that was just started.
+        """
+        if self.interval is None:
+            # Daily at a wall-clock time
+            return now + _seconds_until(self.at_time)
+        missed = int((now - due) // self.interval)
+        return due + (missed + 1) * self.interval
 
 
 class Scheduler:
-    def __init__(self, task_manager: TaskManager):
+    """Runs tasks on their schedules.
+
+    Deadlines are kept in a heap, and the scheduler thread sleeps until the
+    earliest one instead of polling. Due tasks run on a worker pool, so a long
+    sync does not delay the others. A task never runs twice at the same time:
+    if it is still running when its next run is due, that run is skipped, and
+    several missed runs are coalesced into one.
+
+    A task's schedule is a dictionary with the keys:
+
+    - "interval": Seconds between runs.
+    - "at": A "HH:MM" or "HH:MM:SS" local time. Alone, the task runs daily at
+      that time; with "interval", the first run is at that time.
+    - "jitter": Upper bound, in seconds, of a random delay added to the first
+      run so that tasks configured together do not all start together.
+      Defaults to 10% of the interval, at most 60 seconds.
+    - "watch": Run on file system changes instead (see _watch_task).
+    """
+
+    def __init__(self, task_manager: TaskManager, max_workers=DEFAULT_MAX_WORKERS):
         self.task_manager = task_manager
+        self.max_workers = max_workers
         self.scheduler_thread = None
         self.stop_event = threading.Event()
+        self.watchers = []
+        self.pool = None
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
 
     def run_pending_tasks(self):
-        """Runs all pending tasks."""
-        schedule.run_pending()
+        """Starts all tasks that are due.
+
+        Returns:
+            The number of seconds until the next task is due, or None if
+            nothing is scheduled.
+        """
+        with self._condition:
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                due, _, job = heapq.heappop(self._heap)
+                if not job.running:
+                    job.running = True
+                    self.pool.submit(self._run_job, job)
+                self._push(job.next_run(due, now), job)
+            if not self._heap:
+                return None
+            return max(0, self._heap[0][0] - now)
 
     def schedule_tasks(self):
         """Configures the schedule for all tasks."""
+        now = time.monotonic()
         for task in self.task_manager.list_tasks():
+            if task.schedule.get("watch") and self._watch_task(task):
+                continue
             if task.schedule:
                 interval = task.schedule.get("interval")
                 at_time = task.schedule.get("at")
 
-                if interval:
-                    if at_time:
-                        schedule.every(interval).seconds.at(at_time).do(task.execute)
-                    else:
-                        schedule.every(interval).seconds.do(task.execute)
-                elif at_time:
-                    schedule.every().day.at(at_time).do(task.execute)
+                if interval or at_time:
+                    try:
+                        job = self._create_job(task, interval, at_time)
+                    except ValueError as e:
+                        print(
+                            f"Warning: Invalid schedule for task: {task.source} -> "
+                            f"{task.destination} ({e})"
+                        )
+                        continue
+                    with self._condition:
+                        self._push(job.first_run(now), job)
+                        self._condition.notify()
                 else:
                     print(
                         f"Warning: Invalid schedule for task: {task.source} -> {task.destination}"
                     )
 
+    def _create_job(self, task, interval, at_time):
+        """Creates the job for a task's schedule.
+
+        Raises:
+            ValueError: If the interval or time of day is invalid.
+        """
+        if at_time is not None:
+            at_time = _parse_time(at_time)
+        if interval is not None and interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        default_jitter = (
+            min(interval * DEFAULT_JITTER_RATIO, MAX_DEFAULT_JITTER) if interval else 0
+        )
+        jitter = task.schedule.get("jitter", default_jitter)
+        return _Job(task, interval, at_time, jitter)
+
+    def _push(self, due, job):
+        heapq.heappush(self._heap, (due, next(self._sequence), job))
+
+    def _run_job(self, job):
+        try:
+            job.task.execute()
+        except Exception as e:
+            print(
+                f"Error running task {job.task.source} -> {job.task.destination}: {e}"
+            )
+        finally:
+            with self._condition:
+                job.running = False
+
+    def _watch_task(self, task):
+        """Starts an inotify watcher on the source of a task.
+
+        Used for tasks whose schedule sets "watch": changes are synchronized
+        as they happen (after "debounce" seconds of quiet) instead of on an
+        interval.
+
+        Returns:
+            True if the task is watched, False if it has to fall back to its
+            interval schedule.
+        """
+        if not InotifyWatcher.available() or not hasattr(task, "sync_changes"):
+            print(
+                f"Warning: Cannot watch {task.source}, falling back to its schedule"
+            )
+            return False
+        watcher = InotifyWatcher(
+            task.source,
+            task.sync_changes,
+            debounce=task.schedule.get("debounce", DEFAULT_DEBOUNCE),
+        )
+        try:
+            watcher.start()
+        except OSError as e:
+            print(
+                f"Warning: Cannot watch {task.source} ({e}), "
+                "falling back to its schedule"
+            )
+            return False
+        self.watchers.append(watcher)
+        return True
+
     def start(self):
         """Starts the scheduler in a separate thread."""
+        self.stop_event.clear()
+        self.pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="syncary-task"
+        )
         self.schedule_tasks()  # Set up the schedule
         self.scheduler_thread = threading.Thread(target=self._run_scheduler)
         self.scheduler_thread.daemon = (
@@ -43,15 +198,45 @@ class Scheduler:
         self.scheduler_thread.start()
 
     def stop(self):
-        """Stops the scheduler thread."""
+        """Stops the scheduler thread and waits for running tasks to finish."""
+        for watcher in self.watchers:
+            watcher.stop()
+        self.watchers = []
         if self.scheduler_thread:
-            self.stop_event.set()
+            with self._condition:
+                self.stop_event.set()
+                self._condition.notify()
             self.scheduler_thread.join()
             self.scheduler_thread = None
+            self.pool.shutdown(wait=True)
+            self.pool = None
+            with self._condition:
+                self._heap = []
             print("Scheduler stopped.")
 
     def _run_scheduler(self):
         """The main loop of the scheduler thread."""
-        while not self.stop_event.is_set():
-            self.run_pending_tasks()
-            time.sleep(1)  # Check every second
+        with self._condition:
+            while not self.stop_event.is_set():
+                timeout = self.run_pending_tasks()
+                # Sleep until the next deadline, a new job, or stop()
+                self._condition.wait(timeout)
+
+
+def _parse_time(at_time):
+    """Parses "HH:MM" or "HH:MM:SS" into a datetime.time."""
+    for time_format in ("%H:%M:%S", "%H:%M"):
+        try:
+            return datetime.strptime(at_time, time_format).time()
+        except ValueError:
+            continue
+    raise ValueError(f"invalid time of day '{at_time}'")
+
+
+def _seconds_until(at_time):
+    """Returns the seconds until the next local occurrence of a time of day."""
+    now = datetime.now()
+    target = datetime.combine(now.date(), at_time)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
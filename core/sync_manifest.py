@@ -0,0 +1,149 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+_SIDES = ("src", "dst")
+_FIELDS = ("size", "mtime_ns", "inode", "hash")
+
+
+def stat_state(path):
+    """Returns the stat tuple of a local file as a state dictionary.
+
+    Args:
+        path: The path to the file.
+
+    Returns:
+        A dictionary with the keys "size", "mtime_ns" and "inode", or None if
+        the file cannot be stat'ed.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+
+
+def entry_state(entry, path):
+    """Returns the state dictionary for a listing entry.
+
+    Uses the metadata carried by the entry (see
+    FileSyncInterface.get_file_entries) and only falls back to stat'ing the
+    path when the connector did not provide it.
+    """
+    if entry.get("mtime_ns") is None or entry.get("size") is None:
+        return stat_state(path)
+    return {
+        "size": entry["size"],
+        "mtime_ns": entry["mtime_ns"],
+        "inode": entry.get("inode"),
+    }
+
+
+def same_state(recorded, current):
+    """Checks whether a recorded state still describes the current file.
+
+    Only the stat tuple is compared; the hash is what the state buys us.
+    """
+    if recorded is None or current is None:
+        return False
+    return all(
+        recorded.get(key) == current.get(key) for key in ("size", "mtime_ns", "inode")
+    )
+
+
+class SyncManifest:
+    """Persistent record of the last synchronized state of each file in a task.
+
+    For every relative path the manifest stores the size, mtime_ns, inode and
+    last known hash of both the source and the destination copy. When neither
+    stat tuple has changed since the last run, the file can be skipped without
+    reading it.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(
+            f"{side}_{field} {'TEXT' if field == 'hash' else 'INTEGER'}"
+            for side in _SIDES
+            for field in _FIELDS
+        )
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS entries (path TEXT PRIMARY KEY, {columns})"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def for_task(cls, state_dir, source, destination):
+        """Opens the manifest belonging to a source/destination pair.
+
+        Args:
+            state_dir: The directory holding sync state (see
+                ConfigurationManager.get_state_dir).
+            source: The task source.
+            destination: The task destination.
+        """
+        key = hashlib.sha1(f"{source}\0{destination}".encode("utf-8")).hexdigest()
+        return cls(os.path.join(state_dir, f"manifest-{key[:16]}.sqlite"))
+
+    def get(self, relative_path):
+        """Returns the recorded (source_state, destination_state) for a path.
+
+        Either state is None if it was never recorded.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM entries WHERE path = ?", (relative_path,)
+            ).fetchone()
+        if row is None:
+            return None, None
+        values = row[1:]
+        states = []
+        width = len(_FIELDS)
+        for index, _ in enumerate(_SIDES):
+            state = dict(zip(_FIELDS, values[index * width : (index + 1) * width]))
+            states.append(state if state["size"] is not None else None)
+        return states[0], states[1]
+
+    def record(self, relative_path, source_state, destination_state):
+        """Records the state of both copies of a file after a sync decision.
+
+        Args:
+            relative_path: The path relative to the task roots.
+            source_state: State dictionary for the source copy.
+            destination_state: State dictionary for the destination copy, or
+                None if it is not known yet.
+        """
+        values = [relative_path]
+        for state in (source_state, destination_state):
+            state = state or {}
+            values.extend(state.get(field) for field in _FIELDS)
+        placeholders = ", ".join("?" * len(values))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO entries VALUES ({placeholders})", values
+            )
+
+    def forget(self, relative_path):
+        """Removes a path, and everything below it, from the manifest."""
+        prefix = relative_path.rstrip("/") + "/"
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM entries WHERE path = ? OR substr(path, 1, ?) = ?",
+                (relative_path, len(prefix), prefix),
+            )
+
+    def commit(self):
+        """Flushes pending records to disk."""
+        with self._lock:
+            self._conn.commit()
+
+    def close(self):
+        """Commits and closes the underlying database."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,137 @@
+class SyncPlan:
+    """The mutating operations needed to bring a destination in line with a source.
+
+    A plan is built by diffing two flat tree listings and applied afterwards,
+    so every decision (including interactive conflict prompts) is taken before
+    anything is changed on either side.
+    """
+
+    def __init__(self):
+        self.deletions = []
+        self.folders = []
+        self.uploads = []
+        self.moves = []
+
+    def __bool__(self):
+        return bool(self.deletions or self.folders or self.uploads or self.moves)
+
+    def add_deletion(self, relative_path, path, entry_type):
+        """Plans the removal of a destination entry that is gone from the source."""
+        self.deletions.append(
+            {"relative_path": relative_path, "path": path, "type": entry_type}
+        )
+
+    def add_folder(self, relative_path, path):
+        """Plans the creation of a destination folder."""
+        self.folders.append({"relative_path": relative_path, "path": path})
+
+    def add_upload(
+        self,
+        source_path,
+        destination_path,
+        message,
+        relative_path=None,
+        source_state=None,
+        new=False,
+    ):
+        """Plans the transfer of a file.
+
+        Args:
+            source_path: The full source path.
+            destination_path: The full destination path.
+            message: The message printed once the upload succeeded.
+            relative_path: The path relative to the task roots, used to record
+                the result in the manifest. None for uploads that should not
+                be recorded (e.g. renamed conflict copies).
+            source_state: The state of the source copy at planning time.
+            new: True if the file does not exist in the destination yet,
+                which makes it a candidate for move detection.
+        """
+        self.uploads.append(
+            {
+                "source_path": source_path,
+                "destination_path": destination_path,
+                "message": message,
+                "relative_path": relative_path,
+                "source_state": source_state,
+                "new": new,
+            }
+        )
+
+    def add_move(
+        self,
+        from_relative_path,
+        relative_path,
+        from_path,
+        path,
+        entry_type="file",
+        copy=False,
+        source_state=None,
+    ):
+        """Plans a move (or copy) of a destination entry to a new path.
+
+        Args:
+            from_relative_path: The current path, relative to the task roots.
+            relative_path: The new path, relative to the task roots.
+            from_path: The full current destination path.
+            path: The full new destination path.
+            entry_type: "file" or "folder".
+            copy: If True, the entry is copied and the original kept.
+            source_state: For files, the state of the source copy.
+
+        Returns:
+            The planned move. Folder moves carry a "files" list of the
+            uploads they make unnecessary, so the manifest can be updated.
+        """
+        move = {
+            "from_relative_path": from_relative_path,
+            "relative_path": relative_path,
+            "from_path": from_path,
+            "path": path,
+            "type": entry_type,
+            "copy": copy,
+            "source_state": source_state,
+            "files": [],
+        }
+        self.moves.append(move)
+        return move
+
+    def merge(self, other):
+        """Appends the operations of another plan to this one."""
+        self.deletions.extend(other.deletions)
+        self.folders.extend(other.folders)
+        self.uploads.extend(other.uploads)
+        self.moves.extend(other.moves)
+
+    def pruned_deletions(self):
+        """Returns the deletions, minus those inside a folder that is deleted too."""
+        deleted_folders = {
+            deletion["relative_path"]
+            for deletion in self.deletions
+            if deletion["type"] == "folder"
+        }
+        pruned = []
+        for deletion in self.deletions:
+            parent = _parent(deletion["relative_path"])
+            while parent and parent not in deleted_folders:
+                parent = _parent(parent)
+            if not parent:
+                pruned.append(deletion)
+        return pruned
+
+    def folders_by_depth(self):
+        """Returns the planned folders grouped into levels, shallowest first.
+
+        Every folder in a level has its parent either pre-existing or in an
+        earlier level, so each level can be created in parallel.
+        """
+        levels = {}
+        for folder in self.folders:
+            depth = folder["relative_path"].count("/")
+            levels.setdefault(depth, []).append(folder)
+        return [levels[depth] for depth in sorted(levels)]
+
+
+def _parent(relative_path):
+    """Returns the parent of a "/"-separated relative path ("" at the top)."""
+    return relative_path.rpartition("/")[0]
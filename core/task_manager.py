@@ -1,15 +1,25 @@
 import abc
-import hashlib
+import asyncio
+import functools
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
-from core.connectors.dropbox_connector import DropboxConnector
+from config.config_manager import ConfigurationManager
+from core.connectors.async_file_sync_interface import AsyncFileSyncInterface
+from core.connectors.blocking_connector_adapter import BlockingConnectorAdapter
+from core.connectors.connector_pool import ConnectorPool
 from core.connectors.file_sync_interface import (
     FileSynchronizationError,
     FileSyncInterface,
+    PathNotFoundError,
 )
 from core.connectors.local_file_connector import LocalFileConnector
-from core.connectors.google_drive_connector import GoogleDriveConnector
+from core.hashing import get_hash_engine
+from core.sync_manifest import SyncManifest, entry_state, same_state, stat_state
+from core.sync_plan import SyncPlan
+from core.transfer_executor import TransferExecutor
 
 class SyncTask(abc.ABC):
     def __init__(self, source, destination, task_type, options=None, schedule=None):
@@ -50,6 +60,8 @@ class TaskManager:
             cls._instance.config_manager = config_manager
             cls._instance.tasks = []
             cls._instance.task_types = {}  # Registry for task types
+            # Shares clients and connections between the tasks' connectors
+            cls._instance.connector_pool = ConnectorPool(config_manager)
             cls._instance.load_tasks()
         return cls._instance
 
@@ -77,14 +89,11 @@ class TaskManager:
             task.execute()
 
     def create_connector(self, destination):
-        """Creates a connector instance based on the destination URI."""
-        if destination.startswith("dropbox://"):
-            return DropboxConnector(self.config_manager)
-        elif destination.startswith("googledrive://"):
-            return GoogleDriveConnector(self.config_manager)
-        else:
-            # Default to local file connector
-            return LocalFileConnector()
+        """Creates a connector instance based on the destination URI.
+
+        Connectors for the same account share one client (see ConnectorPool).
+        """
+        return self.connector_pool.create_connector(destination)
 
     def load_tasks(self):
         """Loads tasks from the configuration file."""
@@ -123,154 +132,964 @@ class FileSyncTask(SyncTask):
     ):
         super().__init__(source, destination, "file_sync", options, schedule)
         self.connector = connector
+        # Sources are always local paths; the connector handles the destination
+        self.source_connector = LocalFileConnector()
+        self.destination_root = _strip_scheme(destination)
+        self.manifest = None
+        self.executor = None
+        # Serializes runs, e.g. a scheduled run and a watcher-triggered one
+        self._run_lock = threading.Lock()
+        # Guards the uploads staged by transfer workers (see _upload)
+        self._staged_lock = threading.Lock()
+        # File path -> digest hashed ahead on a process pool (see _prehash)
+        self._prehashed = {}
+        # Remote files that cannot be compared, reported once (see _plan_file)
+        self._incomparable = set()
+        # Remote destinations report their own fingerprints, so the local side
+        # must be hashed with the same algorithm to be comparable
+        self.remote_hash_algorithm = getattr(connector, "content_hash_algorithm", None)
+        self.hash_engine = get_hash_engine(
+            self.remote_hash_algorithm or self.options.get("hash_algorithm", "sha256")
+        )
 
     def execute(self):
+        self._run(self._sync_tree)
+
+    def sync_changes(self, folders, trees=()):
+        """Synchronizes only the parts of the tree that are known to have changed.
+
+        Used by the file watcher instead of a full execute().
+
+        Args:
+            folders: Relative paths of folders whose direct entries changed.
+                Each is diffed one level deep; subfolders missing from the
+                destination are synchronized recursively.
+            trees: Relative paths of folders to synchronize recursively. ""
+                stands for the whole tree.
+        """
+        trees = _outermost(trees)
+
+        def sync():
+            if "" in trees:
+                self._sync_tree()
+                return
+            # One plan, so that folders are created parents first and moves
+            # are detected across folders (e.g. a folder renamed or moved to
+            # another parent, which shows up as a new and a vanished folder)
+            plan = SyncPlan()
+            destination_entries = {}
+            for folder in sorted(folders):
+                if not any(_is_within(folder, tree) for tree in trees):
+                    destination_entries.update(self._diff_folder(plan, folder))
+            planned = {folder["relative_path"] for folder in plan.folders}
+            for tree in trees:
+                if tree not in planned:
+                    plan.merge(self._plan_tree(tree))
+            self._list_vanished_folders(plan, destination_entries)
+            self._plan_moves(plan, "", destination_entries)
+            self._plan_deletions(plan, "", destination_entries)
+            self._apply_plan(plan)
+
+        self._run(sync)
+
+    def _run(self, sync):
+        """Runs a sync function with the connector, manifest and executor set up."""
         if self.connector is None:
             print("Error: FileSyncTask requires a connector.")
             return
 
+        with self._run_lock:
+            self._run_locked(sync)
+
+    def _run_locked(self, sync):
+        with self._session(self.connector):
+            self.executor = TransferExecutor.for_connector(
+                self.connector, self.options.get("max_workers", 1)
+            )
+            try:
+                sync()
+                self.executor.wait()
+            finally:
+                self.executor.shutdown()
+                self.executor = None
+
+    @contextmanager
+    def _session(self, connector):
+        """Sets up and tears down one run of the task.
+
+        Shared by the blocking and the asyncio runs: the connector is
+        configured and the manifest opened before the block; errors raised
+        by the block are reported, and the per-run state released, after it.
+
+        Args:
+            connector: The destination connector, blocking or async.
+        """
         print(
-            f"Syncing files from {self.source} to {self.destination} with options: {self.options}"
+            f"Syncing files from {self.source} to {self.destination} "
+            f"with options: {self.options}"
         )
-
+        connector.configure(self.options)
+        self.manifest = self._open_manifest()
         try:
-            self._sync_recursive(self.source, self.destination, "")
+            yield
         except FileSynchronizationError as e:
             print(f"Error during file sync: {e}")
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
+        finally:
+            self._prehashed.clear()
+            if self.manifest is not None:
+                self.manifest.close()
+                self.manifest = None
+
+    def _open_manifest(self):
+        """Opens the sync-state manifest unless disabled by the "manifest" option."""
+        if not self.options.get("manifest", True):
+            return None
+        state_dir = self.options.get("state_dir")
+        if state_dir is None:
+            state_dir = ConfigurationManager().get_state_dir()
+        else:
+            os.makedirs(state_dir, exist_ok=True)
+        return SyncManifest.for_task(state_dir, self.source, self.destination)
+
+    def _compare_files(
+        self,
+        relative_path,
+        source_path,
+        destination_path,
+        source_state,
+        destination_state,
+    ):
+        """Compares the source and destination copies of a file.
+
+        The manifest is consulted first: if neither copy has changed since the
+        last run, no file is read. Otherwise only the side(s) whose stat tuple
+        changed are re-hashed. For remote destinations the destination hash is
+        the fingerprint from the listing (see _remote_state), so the remote
+        file is never downloaded; if the service reported none, the sizes are
+        compared instead (_plan_file skips remote files reporting neither).
+
+        Args:
+            relative_path: The path relative to the task roots.
+            source_path: The full source path.
+            destination_path: The full destination path.
+            source_state: The current state of the source copy.
+            destination_state: The current state of the destination copy.
+
+        Returns:
+            A tuple (unchanged, differs, source_state, destination_state).
+            ``unchanged`` is True when the manifest proved both copies untouched.
+            ``differs`` is True when the checksums do not match.
+        """
+        recorded_source, recorded_destination = (
+            self.manifest.get(relative_path) if self.manifest else (None, None)
+        )
+
+        source_known = same_state(recorded_source, source_state)
+        destination_known = same_state(recorded_destination, destination_state)
+        if source_known and destination_known:
+            return True, False, recorded_source, recorded_destination
+
+        # Recorded hashes are reused only if they came from the same algorithm
+        source_state["hash"] = recorded_source.get("hash") if source_known else None
+        if not self.hash_engine.owns(source_state["hash"]):
+            source_state["hash"] = self._calculate_checksum(source_path)
+        if self.remote_hash_algorithm is not None:
+            if destination_state["hash"] is None:
+                differs = source_state["size"] != destination_state["size"]
+            else:
+                differs = source_state["hash"] != destination_state["hash"]
+            return False, differs, source_state, destination_state
+
+        destination_state["hash"] = (
+            recorded_destination.get("hash") if destination_known else None
+        )
+        if not self.hash_engine.owns(destination_state["hash"]):
+            destination_state["hash"] = self._calculate_checksum(destination_path)
+        differs = source_state["hash"] != destination_state["hash"]
+        return False, differs, source_state, destination_state
+
+    def _remote_state(self, entry):
+        """Returns the state of a remote destination entry from its listing.
+
+        The "hash" reported by the connector is tagged with the connector's
+        content_hash_algorithm, which makes it directly comparable with the
+        local digest computed by self.hash_engine.
+        """
+        remote_hash = entry.get("hash")
+        return {
+            "size": entry.get("size"),
+            "mtime_ns": entry.get("mtime_ns"),
+            "inode": None,
+            "hash": f"{self.remote_hash_algorithm}:{remote_hash}"
+            if remote_hash
+            else None,
+        }
+
+    def _upload(self, upload, staged):
+        """Queues a planned upload on the transfer executor.
+
+        The message is printed, and the manifest updated, once the upload
+        succeeded. Uploads that the connector staged for a grouped commit
+        (see FileSyncInterface.start_upload) are added to ``staged`` instead,
+        as (upload, staged upload) pairs.
+        """
+
+        def started(staged_upload):
+            if staged_upload is None:
+                self._uploaded([upload])
+            else:
+                with self._staged_lock:
+                    staged.append((upload, staged_upload))
+
+        self.executor.submit(
+            self.connector.start_upload,
+            upload["source_path"],
+            upload["destination_path"],
+            on_success=started,
+        )
+
+    def _commit_uploads(self, staged):
+        """Queues the commit of a group of staged uploads on the transfer executor."""
+        self.executor.submit(
+            self.connector.commit_uploads,
+            [(upload["destination_path"], entry) for upload, entry in staged],
+            on_success=lambda failed: self._committed(staged, failed),
+        )
+
+    def _delete(self, deletions):
+        """Queues a group of planned deletions on the transfer executor."""
+        self.executor.submit(
+            self.connector.delete_files,
+            [deletion["path"] for deletion in deletions],
+            on_success=lambda _: self._deleted(deletions),
+        )
+
+    def _create_folders(self, folders):
+        """Queues a group of planned folder creations on the transfer executor."""
+        self.executor.submit(
+            self.connector.create_folders,
+            [folder["path"] for folder in folders],
+            on_success=lambda _: self._folders_created(folders),
+        )
+
+    def _move(self, move):
+        """Queues a planned move or copy on the transfer executor."""
+        connector = self.connector
+        operation = connector.copy_file if move["copy"] else connector.move_file
+        self.executor.submit(
+            operation,
+            move["from_path"],
+            move["path"],
+            on_success=lambda _: self._moved(move),
+        )
+
+    def _moved(self, move):
+        """Reports, and records in the manifest, a finished move or copy."""
+        verb = "Copied" if move["copy"] else "Moved"
+        print(f"{verb}: {move['from_path']} -> {move['path']}")
+        if self.manifest is None:
+            return
+        if not move["copy"]:
+            self.manifest.forget(move["from_relative_path"])
+        for file_move in move["files"] if move["type"] == "folder" else [move]:
+            self._record_upload(
+                file_move["relative_path"], file_move["source_state"], file_move["path"]
+            )
+
+    def _uploaded(self, uploads):
+        """Reports, and records in the manifest, a group of finished uploads."""
+        for upload in uploads:
+            print(
+                f"{upload['message']}: {upload['source_path']} -> "
+                f"{upload['destination_path']}"
+            )
+            if upload["relative_path"] is not None:
+                self._record_upload(
+                    upload["relative_path"],
+                    upload["source_state"],
+                    upload["destination_path"],
+                )
+
+    def _committed(self, staged, failed):
+        """Reports the committed uploads of a group, then raises for the others.
+
+        Args:
+            staged: The (upload, staged upload) pairs that were committed.
+            failed: The reasons of the failed commits, by destination path.
+
+        Raises:
+            FileSynchronizationError: If any upload could not be committed.
+        """
+        self._uploaded(
+            [upload for upload, _ in staged if upload["destination_path"] not in failed]
+        )
+        if failed:
+            raise FileSynchronizationError(
+                "Error committing uploads: "
+                + "; ".join(f"{path}: {reason}" for path, reason in failed.items())
+            )
+
+    def _deleted(self, deletions):
+        """Reports, and forgets in the manifest, a group of finished deletions."""
+        for deletion in deletions:
+            if deletion["type"] == "folder":
+                print(f"Deleted folder: {deletion['path']}")
+            else:
+                print(f"Deleted: {deletion['path']}")
+            if self.manifest is not None:
+                self.manifest.forget(deletion["relative_path"])
+
+    def _folders_created(self, folders):
+        """Reports a group of created folders."""
+        for folder in folders:
+            print(f"Created folder: {folder['path']}")
+
+    def _record_upload(self, relative_path, source_state, destination_path):
+        """Records a freshly uploaded file so the next run can skip it."""
+        if self.manifest is None:
+            return
+        if self.remote_hash_algorithm is not None:
+            # Remote state is taken from the next listing instead
+            destination_state = None
+        else:
+            destination_state = stat_state(destination_path)
+        if destination_state is not None and source_state is not None:
+            destination_state["hash"] = source_state.get("hash")
+        self.manifest.record(relative_path, source_state, destination_state)
 
     def _calculate_checksum(self, file_path):
-        """Calculates the SHA-256 checksum of a file."""
-        hasher = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            while True:
-                chunk = f.read(4096)  # Read in chunks
-                if not chunk:
-                    break
-                hasher.update(chunk)
-        return hasher.hexdigest()
-
-    def _sync_recursive(self, source_root, destination_root, relative_path):
-        """Recursively synchronizes files and folders.
+        """Calculates the checksum of a file with the task's hash algorithm.
+
+        Digests computed ahead by _prehash are used once, then dropped.
+        """
+        digest = self._prehashed.pop(file_path, None)
+        if digest is not None:
+            return digest
+        return self.hash_engine.hash_file(file_path)
+
+    def _sync_tree(self, relative_path=""):
+        """Synchronizes the tree (or a subtree) below the task roots.
+
+        Args:
+            relative_path: The subtree to synchronize, relative to the source
+                and destination roots. Empty for the whole tree.
+        """
+        plan = self._plan_tree(relative_path)
+        self._apply_plan(plan)
+
+    def _plan_tree(self, relative_path=""):
+        """Diffs the source and destination trees into a SyncPlan.
+
+        Both sides are listed with a single list_tree call each. The
+        destination listing is indexed by relative path and the source listing
+        is streamed against it; whatever is left of the destination index
+        afterwards only exists in the destination.
 
         Args:
-            source_root: The root directory of the source.
-            destination_root: The root directory of the destination.
-            relative_path: The path relative to the source and destination roots.
+            relative_path: The subtree to diff, relative to the task roots.
         """
-        source_path = os.path.join(source_root, relative_path)
-        destination_path = os.path.join(destination_root, relative_path)
+        source_path = _join_path(self.source, relative_path)
+        destination_path = _join_path(self.destination_root, relative_path)
 
-        # Get lists of files and folders for source and destination
-        source_entries = self.connector.get_file_list(source_path)
         try:
-            destination_entries = self.connector.get_file_list(destination_path)
-        except FileSynchronizationError:
-            destination_entries = []
-
-        # Create dictionaries for faster lookup
-        source_files = {
-            entry["name"]: {
-                "type": entry["type"],
-                "path": os.path.join(source_path, entry["name"]),
+            destination_entries = {
+                entry["path"]: entry
+                for entry in self.connector.list_tree(destination_path)
             }
-            for entry in source_entries
-        }
-        destination_files = {
-            entry["name"]: {
-                "type": entry["type"],
-                "path": os.path.join(destination_path, entry["name"]),
+        except PathNotFoundError:
+            # Not created yet. Any other listing error aborts the run: treating
+            # the destination as empty would overwrite it without comparison.
+            destination_entries = {}
+
+        return self._diff_tree(
+            relative_path,
+            self.source_connector.list_tree(source_path),
+            destination_entries,
+        )
+
+    def _diff_tree(self, relative_path, source_entries, destination_entries):
+        """Diffs a source tree listing against an indexed destination listing.
+
+        Args:
+            relative_path: The subtree that was listed, relative to the task
+                roots.
+            source_entries: An iterable of source list_tree entries.
+            destination_entries: The destination list_tree entries, keyed by
+                their "path". Matched entries are removed from it.
+        """
+        if self.options.get("processes", 1) > 1:
+            source_entries = list(source_entries)
+            self._prehash(relative_path, source_entries, destination_entries)
+
+        plan = SyncPlan()
+        for source_entry in source_entries:
+            entry_path = source_entry["path"]
+            relative_entry_path = _join_relative(relative_path, entry_path)
+            destination_entry = destination_entries.pop(entry_path, None)
+
+            if source_entry["type"] == "file":
+                self._plan_file(
+                    plan, relative_entry_path, source_entry, destination_entry
+                )
+            elif source_entry["type"] == "folder" and destination_entry is None:
+                # Folder doesn't exist in destination, create it
+                plan.add_folder(
+                    relative_entry_path,
+                    _join_path(self.destination_root, relative_entry_path),
+                )
+
+        self._plan_moves(plan, relative_path, destination_entries)
+        self._plan_deletions(plan, relative_path, destination_entries)
+        return plan
+
+    def _prehash(self, relative_path, source_entries, destination_entries):
+        """Hashes the files that planning will compare on a process pool.
+
+        Used when the "processes" option is above 1: every file that exists on
+        both sides and is not vouched for by the manifest is hashed by
+        HashEngine.hash_files, which shards the work across processes. The
+        plan itself is still built in this process, from the returned
+        digests (kept in self._prehashed until _calculate_checksum uses
+        them), before anything is changed.
+
+        Args:
+            relative_path: The subtree that was listed, relative to the task
+                roots.
+            source_entries: The source list_tree entries.
+            destination_entries: The destination list_tree entries, keyed by
+                their "path".
+        """
+        file_paths = []
+        for source_entry in source_entries:
+            destination_entry = destination_entries.get(source_entry["path"])
+            if source_entry["type"] != "file" or destination_entry is None:
+                continue
+            relative_entry_path = _join_relative(relative_path, source_entry["path"])
+            source_path = _join_path(self.source, relative_entry_path)
+            destination_path = _join_path(self.destination_root, relative_entry_path)
+            recorded_source, recorded_destination = (
+                self.manifest.get(relative_entry_path)
+                if self.manifest
+                else (None, None)
+            )
+            if not self._known_hash(
+                recorded_source, entry_state(source_entry, source_path)
+            ):
+                file_paths.append(source_path)
+            if self.remote_hash_algorithm is None and not self._known_hash(
+                recorded_destination, entry_state(destination_entry, destination_path)
+            ):
+                file_paths.append(destination_path)
+        self._prehashed.update(
+            self.hash_engine.hash_files(file_paths, self.options["processes"])
+        )
+
+    def _known_hash(self, recorded, current):
+        """Checks whether a recorded state still provides a usable hash."""
+        return same_state(recorded, current) and self.hash_engine.owns(
+            recorded.get("hash")
+        )
+
+    def _diff_folder(self, plan, relative_path):
+        """Diffs the direct entries of one folder into a SyncPlan.
+
+        Like _diff_tree, but only lists the folder itself. Subfolders that do
+        not exist in the destination yet are diffed recursively. Moves and
+        deletions are left to the caller, which may combine the leftovers of
+        several folders.
+
+        Args:
+            plan: The SyncPlan to add operations to.
+            relative_path: The folder to diff, relative to the task roots.
+
+        Returns:
+            The destination-only entries, keyed by their path relative to the
+            task roots.
+        """
+        source_path = _join_path(self.source, relative_path)
+        destination_path = _join_path(self.destination_root, relative_path)
+
+        try:
+            source_entries = list(self.source_connector.get_file_entries(source_path))
+        except PathNotFoundError:
+            # The folder is gone; its parent folder reports that change
+            return {}
+        try:
+            destination_entries = {
+                entry["name"]: entry
+                for entry in self.connector.get_file_entries(destination_path)
             }
-            for entry in destination_entries
-        }
+        except PathNotFoundError:
+            destination_entries = {}
 
-        # Handle deletions if the "delete" option is True
-        if self.options.get("delete", False):
-            for name, dest_entry in destination_files.items():
-                if name not in source_files:
-                    if dest_entry["type"] == "file":
-                        self.connector.delete_file(dest_entry["path"])
-                        print(f"Deleted: {dest_entry['path']}")
-                    elif dest_entry["type"] == "folder":
-                        self.connector.delete_file(dest_entry["path"])
-                        print(f"Deleted folder: {dest_entry['path']}")
-        # Iterate through source entries and compare with destination
-        for name, source_entry in source_files.items():
-            source_entry_path = source_entry["path"]
-            relative_entry_path = os.path.join(relative_path, name)
-            destination_entry_path = os.path.join(destination_root, relative_entry_path)
+        for source_entry in source_entries:
+            relative_entry_path = _join_relative(relative_path, source_entry["name"])
+            destination_entry = destination_entries.pop(source_entry["name"], None)
 
             if source_entry["type"] == "file":
-                if name not in destination_files:
-                    # File doesn't exist in destination, upload it
-                    self.connector.upload_file(
-                        source_entry_path, destination_entry_path
+                self._plan_file(
+                    plan, relative_entry_path, source_entry, destination_entry
+                )
+            elif source_entry["type"] == "folder" and destination_entry is None:
+                plan.add_folder(
+                    relative_entry_path,
+                    _join_path(self.destination_root, relative_entry_path),
+                )
+                plan.merge(self._plan_tree(relative_entry_path))
+
+        return {
+            _join_relative(relative_path, name): entry
+            for name, entry in destination_entries.items()
+        }
+
+    def _list_vanished_folders(self, plan, destination_entries):
+        """Adds the contents of destination-only folders to the leftovers.
+
+        A one-level diff sees a renamed folder only as a vanished folder and
+        a new one. Listing what the vanished folder contains lets _plan_moves
+        match its files to the new uploads and collapse them into one folder
+        move. Only done when moves can be detected and there are new uploads.
+
+        Args:
+            plan: The SyncPlan being built.
+            destination_entries: Destination-only entries, keyed by their path
+                relative to the task roots. Updated in place.
+        """
+        if not self._detects_moves() or not any(
+            upload["new"] for upload in plan.uploads
+        ):
+            return
+        vanished_folders = [
+            entry_path
+            for entry_path, entry in destination_entries.items()
+            if entry["type"] == "folder"
+        ]
+        for folder in vanished_folders:
+            try:
+                entries = list(
+                    self.connector.list_tree(_join_path(self.destination_root, folder))
+                )
+            except PathNotFoundError:
+                continue
+            for entry in entries:
+                destination_entries.setdefault(
+                    _join_relative(folder, entry["path"]), entry
+                )
+
+    def _detects_moves(self):
+        """Checks whether renames and moves are applied on the destination side."""
+        return self.options.get("detect_moves", True) and getattr(
+            self.connector, "supports_move", False
+        )
+
+    def _plan_moves(self, plan, relative_path, destination_entries):
+        """Turns uploads of renamed or moved files into destination-side moves.
+
+        New source files are matched against destination-only files. When the
+        manifest recorded the same inode, size and mtime for a vanished path
+        and neither copy changed since, the file was renamed and no content
+        is read at all. Otherwise the size must match, and so must the hash
+        (the connector's fingerprint for remote destinations). With "delete"
+        set the matched file is moved, otherwise it is copied.
+
+        When every destination-only entry below a folder was matched to the
+        same new folder, the file moves are collapsed into one folder move.
+
+        Matched entries are removed from the upload list and from
+        destination_entries. Disabled by the "detect_moves" option or for
+        connectors without supports_move.
+
+        Args:
+            plan: The SyncPlan to rewrite.
+            relative_path: The subtree that was listed, relative to the task
+                roots.
+            destination_entries: The destination-only entries, keyed by their
+                path relative to relative_path.
+        """
+        if not self._detects_moves():
+            return
+        new_uploads = [upload for upload in plan.uploads if upload["new"]]
+        vanished = {
+            _join_relative(relative_path, entry_path): entry
+            for entry_path, entry in destination_entries.items()
+            if entry["type"] == "file"
+        }
+        if not new_uploads or not vanished:
+            return
+
+        by_size = {}
+        by_inode = {}
+        for vanished_path, entry in vanished.items():
+            by_size.setdefault(entry.get("size"), []).append(vanished_path)
+            recorded_source, _ = (
+                self.manifest.get(vanished_path) if self.manifest else (None, None)
+            )
+            if recorded_source is not None and recorded_source.get("inode"):
+                key = (
+                    recorded_source["inode"],
+                    recorded_source["size"],
+                    recorded_source["mtime_ns"],
+                )
+                by_inode[key] = vanished_path
+
+        copy = not self.options.get("delete", False)
+        moved = set()
+        for upload in new_uploads:
+            match = self._match_vanished(upload, vanished, by_size, by_inode)
+            if match is None:
+                continue
+            vanished_path, source_hash = match
+            del vanished[vanished_path]
+            if source_hash is not None:
+                upload["source_state"]["hash"] = source_hash
+            plan.add_move(
+                vanished_path,
+                upload["relative_path"],
+                _join_path(self.destination_root, vanished_path),
+                upload["destination_path"],
+                copy=copy,
+                source_state=upload["source_state"],
+            )
+            moved.add(id(upload))
+        if not moved:
+            return
+        plan.uploads = [upload for upload in plan.uploads if id(upload) not in moved]
+
+        if not copy:
+            for move in plan.moves:
+                destination_entries.pop(
+                    _relative_to(move["from_relative_path"], relative_path), None
+                )
+            self._collapse_folder_moves(plan, relative_path, destination_entries)
+
+    def _match_vanished(self, upload, vanished, by_size, by_inode):
+        """Finds the destination-only file with the content of a new source file.
+
+        Returns:
+            A tuple (vanished relative path, source hash or None), or None.
+        """
+        source_state = upload["source_state"]
+        if source_state is None:
+            return None
+
+        inode_match = by_inode.get(
+            (source_state.get("inode"), source_state["size"], source_state["mtime_ns"])
+        )
+        if inode_match is not None and inode_match in vanished:
+            # The same source file was synchronized to the vanished path; if
+            # neither copy changed since, no content needs to be compared
+            recorded_source, recorded_destination = self.manifest.get(inode_match)
+            entry = vanished[inode_match]
+            if self.remote_hash_algorithm is not None:
+                recorded_hash = recorded_source.get("hash")
+                unchanged = (
+                    self.hash_engine.owns(recorded_hash)
+                    and recorded_hash == self._remote_state(entry)["hash"]
+                )
+            else:
+                unchanged = same_state(
+                    recorded_destination,
+                    entry_state(
+                        entry, _join_path(self.destination_root, inode_match)
+                    ),
+                )
+            if same_state(recorded_source, source_state) and unchanged:
+                return inode_match, recorded_source.get("hash")
+
+        source_hash = None
+        for vanished_path in by_size.get(source_state["size"], []):
+            if vanished_path not in vanished:
+                continue
+            if source_hash is None:
+                source_hash = self._calculate_checksum(upload["source_path"])
+            entry = vanished[vanished_path]
+            if self.remote_hash_algorithm is not None:
+                destination_hash = self._remote_state(entry)["hash"]
+            else:
+                destination_path = _join_path(self.destination_root, vanished_path)
+                _, recorded_destination = (
+                    self.manifest.get(vanished_path) if self.manifest else (None, None)
+                )
+                if self._known_hash(
+                    recorded_destination, entry_state(entry, destination_path)
+                ):
+                    destination_hash = recorded_destination["hash"]
+                else:
+                    destination_hash = self._calculate_checksum(destination_path)
+            if destination_hash is not None and destination_hash == source_hash:
+                return vanished_path, source_hash
+        return None
+
+    def _collapse_folder_moves(self, plan, relative_path, destination_entries):
+        """Replaces the file moves out of a renamed folder by one folder move.
+
+        Args:
+            plan: The SyncPlan to rewrite.
+            relative_path: The subtree that was listed, relative to the task
+                roots.
+            destination_entries: The destination-only entries left after file
+                moves, keyed by their path relative to relative_path.
+        """
+        planned_folders = {folder["relative_path"] for folder in plan.folders}
+        leftovers = [
+            _join_relative(relative_path, entry_path)
+            for entry_path in destination_entries
+        ]
+        vanished_folders = sorted(
+            (
+                _join_relative(relative_path, entry_path)
+                for entry_path, entry in destination_entries.items()
+                if entry["type"] == "folder"
+            ),
+            key=lambda path: path.count("/"),
+        )
+
+        collapsed = {}
+        for folder in vanished_folders:
+            if any(_is_within(folder, done) for done in collapsed):
+                continue
+            target = self._folder_move_target(
+                folder, plan.moves, leftovers, planned_folders
+            )
+            if target is not None:
+                collapsed[folder] = target
+        if not collapsed:
+            return
+
+        file_moves = {}
+        kept_moves = []
+        for move in plan.moves:
+            folder = next(
+                (f for f in collapsed if _is_within(move["from_relative_path"], f)),
+                None,
+            )
+            if folder is None:
+                kept_moves.append(move)
+            else:
+                file_moves.setdefault(folder, []).append(move)
+        plan.moves = kept_moves
+
+        for folder, target in collapsed.items():
+            folder_move = plan.add_move(
+                folder,
+                target,
+                _join_path(self.destination_root, folder),
+                _join_path(self.destination_root, target),
+                entry_type="folder",
+            )
+            folder_move["files"] = file_moves.get(folder, [])
+            # The folder brings its subfolders along
+            moved_folders = {
+                _rebase(path, folder, target)
+                for path in leftovers
+                if _is_within(path, folder)
+            }
+            plan.folders = [
+                planned
+                for planned in plan.folders
+                if planned["relative_path"] not in moved_folders
+            ]
+        for entry_path, path in zip(list(destination_entries), leftovers):
+            if any(_is_within(path, folder) for folder in collapsed):
+                del destination_entries[entry_path]
+
+    def _folder_move_target(self, folder, moves, leftovers, planned_folders):
+        """Returns the new folder a vanished folder was renamed to, or None.
+
+        A vanished folder qualifies when all of its remaining destination-only
+        contents map onto the same new folder: every file was matched to
+        <new folder>/<same sub-path> and every subfolder has a counterpart
+        that is planned to be created. The new folder's parent must already
+        exist, since folder moves run before folders are created.
+        """
+        moves_out = [
+            move
+            for move in moves
+            if move["type"] == "file" and _is_within(move["from_relative_path"], folder)
+        ]
+        if not moves_out:
+            return None
+        sub_path = moves_out[0]["from_relative_path"][len(folder) + 1 :]
+        if not moves_out[0]["relative_path"].endswith("/" + sub_path):
+            return None
+        target = moves_out[0]["relative_path"][: -len(sub_path) - 1]
+        if target not in planned_folders or _parent(target) in planned_folders:
+            return None
+        if any(
+            move["relative_path"] != _rebase(move["from_relative_path"], folder, target)
+            for move in moves_out
+        ):
+            return None
+        for path in leftovers:
+            if (
+                path != folder
+                and _is_within(path, folder)
+                and _rebase(path, folder, target) not in planned_folders
+            ):
+                return None
+        return target
+
+    def _plan_deletions(self, plan, relative_path, destination_entries):
+        """Plans the removal of destination-only entries if "delete" is set.
+
+        Args:
+            plan: The SyncPlan to add operations to.
+            relative_path: The folder the entries were listed from.
+            destination_entries: Leftover destination entries, keyed by their
+                path relative to relative_path.
+        """
+        if not self.options.get("delete", False):
+            return
+        for entry_path, destination_entry in destination_entries.items():
+            relative_entry_path = _join_relative(relative_path, entry_path)
+            plan.add_deletion(
+                relative_entry_path,
+                _join_path(self.destination_root, relative_entry_path),
+                destination_entry["type"],
+            )
+
+    def _plan_file(self, plan, relative_path, source_entry, destination_entry):
+        """Decides what to do with a single source file.
+
+        Args:
+            plan: The SyncPlan to add operations to.
+            relative_path: The path relative to the task roots.
+            source_entry: The source listing entry.
+            destination_entry: The destination listing entry, or None if the
+                file does not exist in the destination.
+        """
+        source_entry_path = _join_path(self.source, relative_path)
+        destination_entry_path = _join_path(self.destination_root, relative_path)
+
+        if destination_entry is None:
+            # File doesn't exist in destination, upload it
+            plan.add_upload(
+                source_entry_path,
+                destination_entry_path,
+                "Uploaded",
+                relative_path,
+                entry_state(source_entry, source_entry_path),
+                new=True,
+            )
+            return
+
+        # File exists in destination, check for conflict
+        if self.remote_hash_algorithm is not None:
+            destination_state = self._remote_state(destination_entry)
+            if destination_state["hash"] is None and destination_state["size"] is None:
+                # Nothing to compare with (e.g. a Google Docs file); planning a
+                # conflict would prompt, or rename, on every run
+                if relative_path not in self._incomparable:
+                    self._incomparable.add(relative_path)
+                    print(
+                        f"Skipped (destination reports no hash or size): "
+                        f"{source_entry_path}"
+                    )
+                return
+        else:
+            destination_state = entry_state(destination_entry, destination_entry_path)
+        unchanged, differs, source_state, dest_state = self._compare_files(
+            relative_path,
+            source_entry_path,
+            destination_entry_path,
+            entry_state(source_entry, source_entry_path),
+            destination_state,
+        )
+        if unchanged:
+            # Neither copy changed since the last run
+            return
+
+        if differs:
+            # Conflict detected!
+            conflict_resolution = self.options.get("conflict_resolution", "prompt")
+
+            if conflict_resolution == "prompt":
+                choice = self._resolve_conflict_with_prompt(
+                    source_entry_path, destination_entry_path
+                )
+                if choice == "source":
+                    plan.add_upload(
+                        source_entry_path,
+                        destination_entry_path,
+                        "Uploaded (source chosen)",
+                        relative_path,
+                        source_state,
                     )
-                    print(f"Uploaded: {source_entry_path} -> {destination_entry_path}")
+                elif choice == "destination":
+                    print(f"Skipped (destination chosen): {source_entry_path}")
                 else:
-                    # File exists in destination, check for conflict
-                    dest_entry = destination_files[name]
-                    source_mtime = os.path.getmtime(source_entry_path)
-                    dest_mtime = os.path.getmtime(dest_entry["path"])
-                    source_checksum = self._calculate_checksum(source_entry_path)
-                    dest_checksum = self._calculate_checksum(dest_entry["path"])
-
-                    if source_checksum != dest_checksum:
-                        # Conflict detected!
-                        conflict_resolution = self.options.get(
-                            "conflict_resolution", "prompt"
-                        )
-
-                        if conflict_resolution == "prompt":
-                            choice = self._resolve_conflict_with_prompt(
-                                source_entry_path, destination_entry_path
-                            )
-                            if choice == "source":
-                                self.connector.upload_file(
-                                    source_entry_path, destination_entry_path
-                                )
-                                print(
-                                    f"Uploaded (source chosen): {source_entry_path} -> {destination_entry_path}"
-                                )
-                            elif choice == "destination":
-                                print(
-                                    f"Skipped (destination chosen): {source_entry_path}"
-                                )
-                            else:
-                                print(f"Skipped (user canceled): {source_entry_path}")
-                        elif conflict_resolution == "rename":
-                            new_destination_entry_path = self._rename_conflicting_file(
-                                destination_entry_path
-                            )
-                            self.connector.upload_file(
-                                source_entry_path, new_destination_entry_path
-                            )
-                            print(
-                                f"Uploaded (renamed destination): {source_entry_path} -> {new_destination_entry_path}"
-                            )
-                        else:
-                            print(
-                                f"Warning: Invalid conflict_resolution option: {conflict_resolution}"
-                            )
-
-                    elif source_mtime > dest_mtime:
-                        # Source is newer but checksum are the same, upload it
-                        self.connector.upload_file(
-                            source_entry_path, destination_entry_path
-                        )
-                        print(
-                            f"Updated: {source_entry_path} -> {destination_entry_path}"
-                        )
-
-            elif source_entry["type"] == "folder":
-                if name not in destination_files:
-                    # Folder doesn't exist in destination, create it
-                    self.connector.create_folder(destination_entry_path)
-                    print(f"Created folder: {destination_entry_path}")
-
-                # Recursively sync the subfolder
-                self._sync_recursive(source_root, destination_root, relative_entry_path)
+                    print(f"Skipped (user canceled): {source_entry_path}")
+            elif conflict_resolution == "rename":
+                plan.add_upload(
+                    source_entry_path,
+                    self._rename_conflicting_file(destination_entry_path),
+                    "Uploaded (renamed destination)",
+                )
+            else:
+                print(
+                    f"Warning: Invalid conflict_resolution option: {conflict_resolution}"
+                )
+
+        elif (
+            # Remote modification times are set by the service on upload and
+            # are not comparable with local ones
+            self.remote_hash_algorithm is None
+            and source_state["mtime_ns"] > dest_state["mtime_ns"]
+        ):
+            # Source is newer but checksum are the same, upload it
+            plan.add_upload(
+                source_entry_path,
+                destination_entry_path,
+                "Updated",
+                relative_path,
+                source_state,
+            )
+        elif self.manifest is not None:
+            # Identical content, remember it for the next run
+            self.manifest.record(relative_path, source_state, dest_state)
+
+    def _apply_plan(self, plan):
+        """Executes a SyncPlan on the transfer executor.
+
+        Folder moves run first. Folders are then created level by level,
+        waiting for each level so that parents always exist before their
+        children, and file moves run once all folders exist. Deletions come
+        after the moves (a vanished folder may still hold moved files), and
+        uploads are queued last, one job per file. Uploads that the connector
+        staged are committed once every upload has finished. Deletions,
+        folders and staged uploads are handed to the connector in groups of
+        its batch_size.
+        """
+        batch_size = max(1, self.connector.batch_size)
+        for move in plan.moves:
+            if move["type"] == "folder":
+                self._move(move)
+        self.executor.wait()
+
+        for level in plan.folders_by_depth():
+            for folders in _batches(level, batch_size):
+                self._create_folders(folders)
+            self.executor.wait()
+
+        for move in plan.moves:
+            if move["type"] == "file":
+                self._move(move)
+        self.executor.wait()
+
+        for deletions in _batches(plan.pruned_deletions(), batch_size):
+            self._delete(deletions)
+
+        staged = []
+        try:
+            for upload in plan.uploads:
+                self._upload(upload, staged)
+            self.executor.wait()
+        finally:
+            # Whatever was staged is committed, even if other uploads failed
+            for group in _batches(staged, batch_size):
+                self._commit_uploads(group)
 
     def _resolve_conflict_with_prompt(self, source_path, destination_path):
         """Prompts the user to choose between source and destination files."""
@@ -308,3 +1127,244 @@ class FileSyncTask(SyncTask):
             task_dict.get("schedule"),
             connector,
         )
+
+
+class AsyncFileSyncTask(FileSyncTask):
+    """A FileSyncTask whose listings and transfers run on an asyncio event loop.
+
+    Both trees are listed concurrently, and up to the "max_in_flight" option
+    (64 by default, capped by the connector's max_concurrency) operations are
+    kept in flight at once, without a thread per operation. Planning, which
+    may hash files or prompt, runs on a worker thread so that other tasks
+    sharing the loop keep going. Blocking connectors are wrapped in a
+    BlockingConnectorAdapter.
+
+    execute() runs the task on a fresh event loop; code that already runs a
+    loop (e.g. to drive many tasks from one process) awaits execute_async().
+    """
+
+    def __init__(
+        self,
+        source,
+        destination,
+        options=None,
+        schedule=None,
+        connector=None,
+    ):
+        super().__init__(source, destination, options, schedule, connector)
+        self.task_type = "async_file_sync"
+        if connector is None or isinstance(connector, AsyncFileSyncInterface):
+            self.async_connector = connector
+        else:
+            self.async_connector = BlockingConnectorAdapter(connector)
+        self.async_source_connector = BlockingConnectorAdapter(self.source_connector)
+
+    def execute(self):
+        with self._run_lock:
+            asyncio.run(self.execute_async())
+
+    async def execute_async(self):
+        """Runs the task on the current event loop."""
+        if self.async_connector is None:
+            print("Error: AsyncFileSyncTask requires a connector.")
+            return
+
+        with self._session(self.async_connector):
+            plan = await self._plan_tree_async()
+            await self._apply_plan_async(plan)
+
+    async def _plan_tree_async(self, relative_path=""):
+        """Lists both trees concurrently and diffs them into a SyncPlan."""
+        source_listing, destination_listing = await asyncio.gather(
+            self.async_source_connector.list_tree(
+                _join_path(self.source, relative_path)
+            ),
+            self.async_connector.list_tree(
+                _join_path(self.destination_root, relative_path)
+            ),
+            return_exceptions=True,
+        )
+        if isinstance(source_listing, BaseException):
+            raise source_listing
+        if isinstance(destination_listing, PathNotFoundError):
+            destination_listing = []
+        elif isinstance(destination_listing, BaseException):
+            raise destination_listing
+
+        destination_entries = {entry["path"]: entry for entry in destination_listing}
+        return await asyncio.to_thread(
+            self._diff_tree, relative_path, source_listing, destination_entries
+        )
+
+    async def _apply_plan_async(self, plan):
+        """Executes a SyncPlan with bounded concurrency.
+
+        The order matches _apply_plan: folder moves, folders level by level
+        and file moves each complete before the next step, then deletions
+        and uploads run together, and the uploads the connector staged are
+        committed last.
+        """
+        connector = self.async_connector
+        batch_size = max(1, connector.batch_size)
+        limit = min(self.options.get("max_in_flight", 64), connector.max_concurrency)
+        in_flight = asyncio.Semaphore(max(1, limit))
+
+        async def run(operation, arguments, on_success):
+            async with in_flight:
+                await operation(*arguments)
+            on_success()
+
+        def start(operation, arguments, on_success):
+            return asyncio.ensure_future(run(operation, arguments, on_success))
+
+        def start_move(move):
+            operation = connector.copy_file if move["copy"] else connector.move_file
+            return start(
+                operation,
+                (move["from_path"], move["path"]),
+                functools.partial(self._moved, move),
+            )
+
+        await _gather_all(
+            [start_move(move) for move in plan.moves if move["type"] == "folder"]
+        )
+        for level in plan.folders_by_depth():
+            await _gather_all(
+                [
+                    start(
+                        connector.create_folders,
+                        ([folder["path"] for folder in folders],),
+                        functools.partial(self._folders_created, folders),
+                    )
+                    for folders in _batches(level, batch_size)
+                ]
+            )
+        await _gather_all(
+            [start_move(move) for move in plan.moves if move["type"] == "file"]
+        )
+
+        staged = []
+
+        async def upload(planned):
+            async with in_flight:
+                staged_upload = await connector.start_upload(
+                    planned["source_path"], planned["destination_path"]
+                )
+            if staged_upload is None:
+                self._uploaded([planned])
+            else:
+                staged.append((planned, staged_upload))
+
+        async def commit(group):
+            async with in_flight:
+                failed = await connector.commit_uploads(
+                    [(planned["destination_path"], entry) for planned, entry in group]
+                )
+            self._committed(group, failed)
+
+        pending = [
+            start(
+                connector.delete_files,
+                ([deletion["path"] for deletion in deletions],),
+                functools.partial(self._deleted, deletions),
+            )
+            for deletions in _batches(plan.pruned_deletions(), batch_size)
+        ]
+        pending.extend(
+            asyncio.ensure_future(upload(planned)) for planned in plan.uploads
+        )
+        try:
+            await _gather_all(pending)
+        finally:
+            await _gather_all(
+                [
+                    asyncio.ensure_future(commit(group))
+                    for group in _batches(staged, batch_size)
+                ]
+            )
+
+    @staticmethod
+    def from_dict(task_dict, connector):
+        """Creates an AsyncFileSyncTask object from a dictionary."""
+        return AsyncFileSyncTask(
+            task_dict["source"],
+            task_dict["destination"],
+            task_dict.get("options"),
+            task_dict.get("schedule"),
+            connector,
+        )
+
+
+async def _gather_all(tasks):
+    """Waits for asyncio tasks, cancelling the rest as soon as one fails.
+
+    Raises:
+        FileSynchronizationError: If any task failed.
+    """
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException as e:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if isinstance(e, Exception) and not isinstance(e, FileSynchronizationError):
+            raise FileSynchronizationError(str(e)) from e
+        raise
+
+
+def _batches(items, batch_size):
+    """Splits a list into consecutive groups of at most batch_size items."""
+    return [
+        items[start : start + batch_size] for start in range(0, len(items), batch_size)
+    ]
+
+
+def _strip_scheme(uri):
+    """Returns the path part of a "scheme://path" URI (or the URI unchanged)."""
+    _, separator, path = uri.partition("://")
+    return path if separator else uri
+
+
+def _join_path(root, relative_path):
+    """Joins a "/"-separated relative path onto a task root."""
+    if not relative_path:
+        return root
+    return os.path.join(root, *relative_path.split("/"))
+
+
+def _join_relative(parent, name):
+    """Joins two "/"-separated relative paths."""
+    return f"{parent}/{name}" if parent else name
+
+
+def _parent(relative_path):
+    """Returns the parent of a "/"-separated relative path ("" at the top)."""
+    return relative_path.rpartition("/")[0]
+
+
+def _relative_to(relative_path, folder):
+    """Returns a relative path below a folder relative to that folder."""
+    return relative_path[len(folder) + 1 :] if folder else relative_path
+
+
+def _rebase(relative_path, folder, target):
+    """Moves a relative path at or below a folder to the same place below target."""
+    return target + relative_path[len(folder) :]
+
+
+def _is_within(relative_path, folder):
+    """Checks whether a relative path is a folder or lies below it."""
+    return (
+        not folder
+        or relative_path == folder
+        or relative_path.startswith(folder + "/")
+    )
+
+
+def _outermost(relative_paths):
+    """Drops the paths that lie below another path of the collection."""
+    outermost = []
+    for path in sorted(relative_paths, key=lambda p: (p.count("/"), p)):
+        if not any(_is_within(path, folder) for folder in outermost):
+            outermost.append(path)
+    return outermost
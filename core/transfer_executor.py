@@ -0,0 +1,117 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+
+from core.connectors.file_sync_interface import FileSynchronizationError
+from core.connectors.worker_pool import get_worker_pool
+
+
+class TransferExecutor:
+    """Runs independent connector operations on a bounded thread pool.
+
+    With ``max_workers=1`` operations run inline on the calling thread, which
+    keeps the historical sequential behavior (including raising errors right
+    away). With more workers, operations are queued and errors are collected
+    and raised from ``wait()`` once every queued operation has finished.
+    """
+
+    def __init__(self, max_workers=1, pool=None):
+        """Initializes the executor.
+
+        Args:
+            max_workers: The number of operations to run at once.
+            pool: A ThreadPoolExecutor to run them on, which is shared and
+                left running by shutdown(). By default the executor creates
+                its own pool.
+        """
+        self.max_workers = max(1, int(max_workers))
+        self._owns_pool = pool is None
+        if self.max_workers == 1:
+            self._pool = None
+        elif pool is not None:
+            self._pool = pool
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="syncary-transfer"
+            )
+        self._futures = []
+        self._errors = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_connector(cls, connector, requested_workers):
+        """Creates an executor capped by the connector's advertised concurrency.
+
+        The operations run on the connector's shared worker pool (see
+        get_worker_pool), which outlives the executor.
+        """
+        limit = getattr(connector, "max_concurrency", 1)
+        max_workers = min(max(1, int(requested_workers)), limit)
+        if max_workers == 1:
+            return cls(1)
+        return cls(max_workers, get_worker_pool(connector, max_workers))
+
+    def submit(self, operation, *args, on_success=None):
+        """Schedules an operation.
+
+        Args:
+            operation: The callable to run (typically a connector method).
+            *args: Positional arguments for the operation.
+            on_success: Optional callable invoked with the operation's result
+                once it completed without raising.
+        """
+        if self._pool is None:
+            result = operation(*args)
+            if on_success is not None:
+                on_success(result)
+            return
+
+        def run():
+            try:
+                result = operation(*args)
+                if on_success is not None:
+                    on_success(result)
+            except Exception as e:
+                with self._lock:
+                    self._errors.append(e)
+
+        future = self._pool.submit(run)
+        with self._lock:
+            self._futures.append(future)
+
+    def wait(self):
+        """Blocks until all queued operations finished.
+
+        Raises:
+            FileSynchronizationError: If any queued operation failed.
+        """
+        while True:
+            with self._lock:
+                futures, self._futures = self._futures, []
+            if not futures:
+                break
+            for future in futures:
+                future.result()
+
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            if len(errors) > 1:
+                print(f"{len(errors)} operations failed, first error follows.")
+            if isinstance(errors[0], FileSynchronizationError):
+                raise errors[0]
+            raise FileSynchronizationError(str(errors[0])) from errors[0]
+
+    def shutdown(self):
+        """Waits for queued operations and releases the executor's own pool.
+
+        A shared pool is left running for the next executor.
+        """
+        if self._pool is None:
+            return
+        with self._lock:
+            futures, self._futures = self._futures, []
+        wait_futures(futures)
+        if self._owns_pool:
+            self._pool.shutdown(wait=True)
+        self._pool = None
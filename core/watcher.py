@@ -0,0 +1,273 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+import time
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_CREATE
+    | IN_DELETE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+    | IN_EXCL_UNLINK
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_MAX_DELAY = 5.0
+
+
+def _load_libc():
+    """Returns libc with the inotify functions, or None if unavailable."""
+    try:
+        libc = ctypes.CDLL(
+            ctypes.util.find_library("c") or "libc.so.6", use_errno=True
+        )
+        init = libc.inotify_init1
+        add_watch = libc.inotify_add_watch
+        rm_watch = libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    init.argtypes = [ctypes.c_int]
+    init.restype = ctypes.c_int
+    add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    add_watch.restype = ctypes.c_int
+    rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    rm_watch.restype = ctypes.c_int
+    return libc
+
+
+_libc = _load_libc()
+
+
+class InotifyWatcher:
+    """Watches a local tree with inotify and reports which parts changed.
+
+    Every folder below the root gets a watch. Events are collected into two
+    sets of "/"-separated paths relative to the root:
+
+    - folders: folders whose direct entries changed (a file was written,
+      created, deleted or moved);
+    - trees: folders that appeared (created or moved in) and must be scanned
+      recursively, since files may have been added before their watch was.
+
+    Bursts are coalesced: the callback runs once no event arrived for
+    ``debounce`` seconds, or at the latest ``max_delay`` seconds after the
+    first pending event. If the kernel queue overflowed, the callback gets
+    the whole tree ("" in trees). The first callback after start() is always
+    a full scan, to pick up changes made while nothing was watching.
+
+    The callback runs on the watcher thread; events arriving meanwhile are
+    queued by the kernel.
+    """
+
+    def __init__(
+        self,
+        root,
+        on_change,
+        debounce=DEFAULT_DEBOUNCE,
+        max_delay=DEFAULT_MAX_DELAY,
+    ):
+        """Initializes the watcher.
+
+        Args:
+            root: The local folder to watch.
+            on_change: Called as on_change(folders, trees) with two sets of
+                relative paths.
+            debounce: Seconds of quiet after which pending changes are
+                reported.
+            max_delay: Upper bound, in seconds, on how long a change waits
+                while events keep arriving.
+        """
+        self.root = root
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self._fd = None
+        self._watches = {}  # watch descriptor -> relative folder path
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def available():
+        """Returns True if inotify can be used on this platform."""
+        return _libc is not None
+
+    def start(self):
+        """Adds the watches and starts the watcher thread.
+
+        Raises:
+            OSError: If inotify is unavailable or a watch cannot be added
+                (e.g. fs.inotify.max_user_watches is exhausted).
+        """
+        if _libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            _raise_errno("inotify_init1")
+        self._fd = fd
+        try:
+            self._watch_tree("")
+        except OSError:
+            self._close()
+            raise
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the watcher thread and releases the watches."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._close()
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._watches.clear()
+
+    def _add_watch(self, relative_path):
+        path = os.path.join(self.root, relative_path) if relative_path else self.root
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return  # Vanished (or replaced) before we got to it
+            raise OSError(
+                error, f"inotify_add_watch '{path}': {os.strerror(error)}"
+            )
+        self._watches[wd] = relative_path
+
+    def _watch_tree(self, relative_path):
+        """Adds watches for a folder and every folder below it."""
+        pending = [relative_path]
+        while pending:
+            current = pending.pop()
+            self._add_watch(current)
+            path = os.path.join(self.root, current) if current else self.root
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(
+                                f"{current}/{entry.name}" if current else entry.name
+                            )
+            except OSError:
+                continue
+
+    def _unwatch_tree(self, relative_path):
+        """Removes the watches of a folder that moved away, and its subfolders."""
+        prefix = relative_path + "/"
+        for wd, path in list(self._watches.items()):
+            if path == relative_path or path.startswith(prefix):
+                _libc.inotify_rm_watch(self._fd, wd)
+                del self._watches[wd]
+
+    def _run(self):
+        folders = set()
+        trees = {""}
+        first_event = last_event = time.monotonic()
+        while not self._stop_event.is_set():
+            pending = bool(folders or trees)
+            if pending:
+                now = time.monotonic()
+                timeout = min(
+                    last_event + self.debounce - now,
+                    first_event + self.max_delay - now,
+                )
+            else:
+                timeout = 1.0  # Only to notice stop()
+
+            if timeout > 0:
+                readable, _, _ = select.select([self._fd], [], [], timeout)
+                if readable:
+                    if not pending:
+                        first_event = time.monotonic()
+                    last_event = time.monotonic()
+                    self._read_events(folders, trees)
+                    continue
+
+            if pending:
+                try:
+                    self.on_change(folders, trees)
+                except Exception as e:
+                    print(f"Error handling changes in {self.root}: {e}")
+                folders = set()
+                trees = set()
+
+    def _read_events(self, folders, trees):
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            self._handle_event(wd, mask, name, folders, trees)
+
+    def _handle_event(self, wd, mask, name, folders, trees):
+        if mask & IN_Q_OVERFLOW:
+            trees.add("")
+            return
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+        folder = self._watches.get(wd)
+        if folder is None:
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            # Reported (and handled) as a change of the parent folder, except
+            # for the root itself
+            if not folder:
+                trees.add("")
+            return
+
+        folders.add(folder)
+        if mask & IN_ISDIR and name:
+            path = f"{folder}/{name}" if folder else name
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self._watch_tree(path)
+                except OSError as e:
+                    print(f"Warning: Cannot watch {path}: {e}")
+                    trees.add("")
+                trees.add(path)
+            elif mask & IN_MOVED_FROM:
+                self._unwatch_tree(path)
+
+
+def _raise_errno(function):
+    error = ctypes.get_errno()
+    raise OSError(error, f"{function}: {os.strerror(error)}")
@@ -1,8 +1,7 @@
 from config.config_manager import ConfigurationManager
-from core.task_manager import TaskManager, FileSyncTask
+from core.task_manager import TaskManager, FileSyncTask, AsyncFileSyncTask
 from core.scheduler import Scheduler
 from core.connectors.local_file_connector import LocalFileConnector
-from core.connectors.dropbox_connector import DropboxConnector
 
 import time
 import os
@@ -16,6 +15,7 @@ if __name__ == "__main__":
 
     # Register the FileSyncTask type
     task_manager.register_task_type("file_sync", FileSyncTask)
+    task_manager.register_task_type("async_file_sync", AsyncFileSyncTask)
 
     # Define source and destination folders
     source_folder = "test_source"  # This will be the local folder
@@ -32,7 +32,7 @@ if __name__ == "__main__":
         f.write("Content of file 3")
 
     local_connector = LocalFileConnector()  # Use LocalFileConnector for the source
-    dropbox_connector = DropboxConnector(config_manager)  # Use DropboxConnector for the destination
+    dropbox_connector = task_manager.create_connector(destination_folder)  # Use DropboxConnector for the destination
     # Create and add a task (if there are none in the config)
     if not task_manager.list_tasks():
         task1 = FileSyncTask(